@@ -1,23 +1,47 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
 import sys
 import re
+import json
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import datetime
-import io
 import numpy as np
 import threading
 import difflib
+import gc
+import ctypes
+import hashlib
+import hmac
+import heapq
+import pickle
+import sqlite3
+import bisect
+import random
+import zlib
 import os
+import io
+import base64
+import queue
+import urllib.request
+import urllib.error
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import Counter, deque
+from contextlib import contextmanager, ExitStack
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QComboBox, QLineEdit, QTextEdit,
     QPushButton, QSizePolicy, QMessageBox, QMenu,
-    QDialog, QDialogButtonBox, QScrollArea, QCheckBox, QFormLayout
+    QDialog, QDialogButtonBox, QScrollArea, QCheckBox, QFormLayout, QFileDialog, QDateEdit
 )
 from PyQt6.QtGui import QPixmap, QImage, QAction, QKeySequence, QFontDatabase, QIcon
-from PyQt6.QtCore import Qt, pyqtSignal, QBuffer, QIODeviceBase
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QFileSystemWatcher, QDate
+
+from PIL import Image, ImageDraw, ImageFont, ImageSequence
 
-import easyocr
-from PIL import Image
 
 PALETTE = {
     "background": "#1A243D",      
@@ -28,6 +52,50 @@ PALETTE = {
     "widget_bg_alt": "#4f2834"      
 }
 
+EVENT_TYPES = ["Combat Training", "Crate Run", "Rally", "Raid", "Patrol", "Fort Event", "Miscellaneous Event", "Mandatory Event", "Practise Raid"]
+SQUADS = ["1P", "1A", "1B", "1C","2P", "2A", "2B", "2C", "3P", "3A", "3B", "3C", "HQ"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+USERNAME_PATTERN = r'\]\s*([a-zA-Z0-9_]+)'
+# Characters the recognizer may output: everything a username can contain, plus the
+# rank brackets and the space that separate it from the rank.
+OCR_ALLOWLIST = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_[] "
+OCR_DECODERS = ("greedy", "beamsearch", "wordbeamsearch")
+SIMILARITY_THRESHOLD = 0.8
+LOW_CONFIDENCE = 0.4
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+VIDEO_EXTENSIONS = ('.gif', '.mp4', '.mkv', '.webm', '.mov', '.avi')
+
+DEFAULT_SETTINGS = {
+    "preprocess": True,
+    "preprocess_crop": True,
+    "preprocess_grayscale": True,
+    "preprocess_text_height": 24,
+    "layout_mode": "auto",
+    "parse_mode": "rows",
+    "ocr_backend": "torch-int8",
+    "ocr_threads": 0,
+    "ocr_allowlist": True,
+    "ocr_decoder": "greedy",
+    "ocr_warm_start": True,
+    "video_sample_interval": 0.5,
+    "tile_workers": 0,
+    "tile_min_rows": 15,
+    "ocr_server": "",
+    "serve_batch_window_ms": 20,
+    "serve_max_batch": 8,
+    "ocr_cache": True,
+    "ocr_cache_mb": 50,
+    "ocr_cache_perceptual": False,
+    "ocr_cache_max_distance": 6,
+    "idle_unload_minutes": 15,
+    "show_stage_timings": False,
+    "record_history": True,
+    "history_db": "",
+}
+OCR_SETTING_KEYS = ("preprocess", "preprocess_crop", "preprocess_grayscale", "preprocess_text_height", "layout_mode",
+                    "ocr_backend", "ocr_allowlist", "ocr_decoder", "parse_mode")
+OCR_BACKENDS = ("torch-int8", "torch", "onnx", "onnx-int8")
+
 def resource_path(relative_path):
     try:
         base_path = sys._MEIPASS
@@ -43,10 +111,1793 @@ def is_valid_roblox_username(username):
     if not re.fullmatch(r'[a-zA-Z0-9_]+', username): return False
     return True
 
+def bigram_keys(name, length):
+    counts = Counter()
+    keys = []
+    for i in range(len(name) - 1):
+        bigram = name[i:i + 2]
+        counts[bigram] += 1
+        keys.append((zlib.crc32(f"{bigram}\x00{counts[bigram]}".encode()) << 16) | length)
+    return keys
+
+MATCHER_ARRAYS = (("lengths", np.int64), ("keys", np.uint64), ("ids", np.int64),
+                  ("ids_by_length", np.int64), ("sorted_lengths", np.int64), ("present_lengths", np.int64))
+
+class UsernameMatcher:
+    # Bigram index over the roster that returns exactly what difflib.get_close_matches
+    # would. Names whose ratio can reach the cutoff must share a minimum number of
+    # bigram occurrences with the query, so only those are scored with SequenceMatcher.
+    def __init__(self, names, arrays=None):
+        if arrays is None:
+            self.names = sorted({name.strip() for name in names if name.strip()})
+            arrays = self._build_arrays(self.names)
+        else:
+            self.names = names
+        for field, _ in MATCHER_ARRAYS:
+            setattr(self, field, arrays[field])
+        self.source_path = None
+        self.source_stat = None
+        self.digest = None
+
+    @staticmethod
+    def _build_arrays(names):
+        lengths = np.array([len(name) for name in names], dtype=np.int64)
+        keys, ids = [], []
+        for index, name in enumerate(names):
+            name_keys = bigram_keys(name, len(name))
+            keys.extend(name_keys)
+            ids.extend([index] * len(name_keys))
+        keys = np.array(keys, dtype=np.uint64)
+        order = np.argsort(keys, kind='stable')
+        ids_by_length = np.argsort(lengths, kind='stable')
+        return {"lengths": lengths, "keys": keys[order], "ids": np.array(ids, dtype=np.int64)[order],
+                "ids_by_length": ids_by_length, "sorted_lengths": lengths[ids_by_length],
+                "present_lengths": np.unique(lengths)}
+
+    def __contains__(self, name):
+        index = bisect.bisect_left(self.names, name)
+        return index < len(self.names) and self.names[index] == name
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_close_matches(self, word, n=3, cutoff=0.6):
+        if not self.names or not word:
+            return []
+        if cutoff <= 0:
+            candidates = range(len(self.names))
+        else:
+            candidates = self._candidates(word, cutoff)
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(word)
+        result = []
+        for index in candidates:
+            name = self.names[index]
+            matcher.set_seq1(name)
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                score = matcher.ratio()
+                if score >= cutoff:
+                    result.append((score, name))
+        return [(name, score) for score, name in heapq.nlargest(n, result)]
+
+    def _candidates(self, word, cutoff):
+        word_length = len(word)
+        query = np.array(bigram_keys(word, 0), dtype=np.uint64)
+        required = {}
+        for length in self.present_lengths.tolist():
+            total = word_length + length
+            if 2.0 * min(word_length, length) / total < cutoff:
+                continue
+            min_matches = max(1, int(cutoff * total / 2))
+            while 2.0 * min_matches / total < cutoff:
+                min_matches += 1
+            required[length] = 3 * min_matches - 1 - total
+        if not required:
+            return []
+        candidates = []
+        scan_lengths = [length for length, shared in required.items() if shared <= 0]
+        for length in scan_lengths:
+            start, end = np.searchsorted(self.sorted_lengths, [length, length + 1])
+            candidates.append(self.ids_by_length[start:end])
+        indexed_lengths = np.array([length for length, shared in required.items() if shared > 0], dtype=np.uint64)
+        if len(query) and len(indexed_lengths):
+            lookup = (query[:, None] | indexed_lengths[None, :]).ravel()
+            starts = np.searchsorted(self.keys, lookup, side='left')
+            ends = np.searchsorted(self.keys, lookup, side='right')
+            hits = [self.ids[start:end] for start, end in zip(starts.tolist(), ends.tolist()) if end > start]
+            if hits:
+                hit_ids, shared = np.unique(np.concatenate(hits), return_counts=True)
+                needed = np.array([required[length] for length in self.lengths[hit_ids].tolist()])
+                candidates.append(hit_ids[shared >= needed])
+        if not candidates:
+            return []
+        return np.unique(np.concatenate(candidates)).tolist()
+
+def load_settings():
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        with open('settings.json', 'r') as f:
+            settings.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        print(f"WARNING: Could not read settings.json ({e}). Using defaults.")
+    return settings
+
+def user_cache_dir():
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'Themis SELA')
+
+def resident_memory_mb(peak=False):
+    if sys.platform == 'win32':
+        from ctypes import wintypes
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return (counters.PeakWorkingSetSize if peak else counters.WorkingSetSize) / 2**20
+    try:
+        with open('/proc/self/status', 'r') as f:
+            field = "VmHWM:" if peak else "VmRSS:"
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def release_ocr_memory():
+    gc.collect()
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    if sys.platform.startswith('linux'):
+        try:
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+def default_roster_path():
+    return 'usernames.txt' if os.path.exists('usernames.txt') else resource_path('usernames.txt')
+
+def read_username_file(path):
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+ROSTER_SNAPSHOT_MAGIC = b"SELAROS1"
+
+def roster_snapshot_prefix(source_path):
+    path_key = hashlib.blake2b(os.path.abspath(source_path).encode(), digest_size=4).hexdigest()
+    return os.path.join(user_cache_dir(), 'rosters', f"roster-{path_key}-")
+
+def save_roster_snapshot(matcher, source_path, source_stat, digest):
+    # Layout: magic, header length, JSON header, then the names and matcher arrays,
+    # each 8-byte aligned so they can be viewed straight out of the memory map.
+    blobs = [("names", np.frombuffer('\n'.join(matcher.names).encode('utf-8'), dtype=np.uint8))]
+    blobs += [(field, np.ascontiguousarray(getattr(matcher, field), dtype=dtype)) for field, dtype in MATCHER_ARRAYS]
+    header = {"source": os.path.abspath(source_path), "mtime_ns": source_stat[0], "size": source_stat[1],
+              "digest": digest, "count": len(matcher.names), "arrays": {}}
+    offset = 0
+    for field, array in blobs:
+        header["arrays"][field] = [offset, array.nbytes]
+        offset += -(-array.nbytes // 8) * 8
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b" " * (-(len(ROSTER_SNAPSHOT_MAGIC) + 8 + len(header_bytes)) % 8)
+    prefix = roster_snapshot_prefix(source_path)
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+    # A fresh name each time, because a snapshot still mapped by a running instance
+    # cannot be replaced on Windows.
+    path = f"{prefix}{time.time_ns()}.bin"
+    with open(path + ".tmp", 'wb') as f:
+        f.write(ROSTER_SNAPSHOT_MAGIC + len(header_bytes).to_bytes(8, 'little') + header_bytes)
+        for _, array in blobs:
+            f.write(array.tobytes())
+            f.write(b"\0" * (-array.nbytes % 8))
+    os.replace(path + ".tmp", path)
+    for stale in os.listdir(os.path.dirname(prefix)):
+        stale_path = os.path.join(os.path.dirname(prefix), stale)
+        if stale_path.startswith(prefix) and stale_path != path:
+            try:
+                os.remove(stale_path)
+            except OSError:
+                pass
+    return path
+
+def open_roster_snapshot(path):
+    raw = np.memmap(path, dtype=np.uint8, mode='r')
+    if bytes(raw[:len(ROSTER_SNAPSHOT_MAGIC)]) != ROSTER_SNAPSHOT_MAGIC:
+        raise ValueError("not a roster snapshot")
+    header_start = len(ROSTER_SNAPSHOT_MAGIC) + 8
+    header_length = int.from_bytes(bytes(raw[len(ROSTER_SNAPSHOT_MAGIC):header_start]), 'little')
+    header = json.loads(bytes(raw[header_start:header_start + header_length]))
+    data_start = header_start + header_length
+    def view(field, dtype):
+        offset, nbytes = header["arrays"][field]
+        return raw[data_start + offset:data_start + offset + nbytes].view(dtype)
+    names = bytes(view("names", np.uint8)).decode('utf-8').split('\n') if header["count"] else []
+    return header, UsernameMatcher(names, {field: view(field, dtype) for field, dtype in MATCHER_ARRAYS})
+
+def load_roster(path):
+    # Loads the roster from its compiled snapshot, rebuilding the snapshot only when
+    # the text file's size and mtime changed and its contents hash differently.
+    st = os.stat(path)
+    source_stat = (st.st_mtime_ns, st.st_size)
+    prefix = roster_snapshot_prefix(path)
+    snapshots = []
+    if os.path.isdir(os.path.dirname(prefix)):
+        snapshots = sorted((os.path.join(os.path.dirname(prefix), name) for name in os.listdir(os.path.dirname(prefix))),
+                           reverse=True)
+        snapshots = [snapshot for snapshot in snapshots if snapshot.startswith(prefix) and snapshot.endswith('.bin')]
+    header, matcher, digest = None, None, None
+    if snapshots:
+        try:
+            header, matcher = open_roster_snapshot(snapshots[0])
+        except (OSError, ValueError, KeyError):
+            header, matcher = None, None
+    if header is not None:
+        digest = header["digest"]
+    if header is None or (header["mtime_ns"], header["size"]) != source_stat:
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if header is None or header["digest"] != digest:
+            matcher = UsernameMatcher([line.strip() for line in content.decode('utf-8-sig', errors='replace').splitlines() if line.strip()])
+        try:
+            header, matcher = open_roster_snapshot(save_roster_snapshot(matcher, path, source_stat, digest))
+        except OSError as e:
+            print(f"WARNING: Could not write roster snapshot ({e}).")
+    matcher.source_path = path
+    matcher.source_stat = source_stat
+    matcher.digest = digest
+    return matcher
+
+def benchmark_matcher(roster_path, roster_size, query_count, cutoff=0.8):
+    names = read_username_file(roster_path) if roster_path else []
+    rng = random.Random(1)
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    while len(names) < roster_size:
+        names.append(''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 20))))
+    roster = set(names)
+    queries = []
+    for _ in range(query_count):
+        chars = list(rng.choice(names))
+        for _ in range(rng.randint(0, 2)):
+            position = rng.randrange(len(chars))
+            if rng.random() < 0.5 and len(chars) > 3:
+                del chars[position]
+            else:
+                chars[position] = rng.choice(alphabet)
+        queries.append(''.join(chars))
+    start = time.perf_counter()
+    matcher = UsernameMatcher(names)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [matcher.get_close_matches(query, n=1, cutoff=cutoff) for query in queries]
+    indexed_time = time.perf_counter() - start
+    start = time.perf_counter()
+    reference = [difflib.get_close_matches(query, roster, n=1, cutoff=cutoff) for query in queries]
+    difflib_time = time.perf_counter() - start
+    mismatches = sum(1 for got, expected in zip(indexed, reference) if [name for name, _ in got] != expected)
+    return {
+        "roster_size": len(matcher),
+        "queries": len(queries),
+        "index_build_ms": round(build_time * 1000, 2),
+        "indexed_ms_per_query": round(indexed_time * 1000 / len(queries), 4),
+        "difflib_ms_per_query": round(difflib_time * 1000 / len(queries), 4),
+        "mismatches": mismatches,
+    }
+
+def render_synthetic_screenshot(names, rng, canvas_size, text_height, noise):
+    width, height = canvas_size
+    font = ImageFont.truetype(resource_path('IBMPlexSans-Medium.ttf'), text_height)
+    hud_font = ImageFont.truetype(resource_path('IBMPlexSans-Medium.ttf'), max(10, text_height - 4))
+    image = Image.new("RGB", (width, height), (30, 31, 34))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, text_height * 2), fill=(54, 57, 63))
+    draw.text((text_height, text_height // 2), "Voice Connected  |  General", font=hud_font, fill=(185, 187, 190))
+    row_height = int(text_height * 1.8)
+    left = rng.randint(text_height, max(text_height, width // 4))
+    top = text_height * 4
+    shown = names[:max(1, (height - top - text_height) // row_height)]
+    for row, name in enumerate(shown):
+        y = top + row * row_height
+        avatar = int(text_height * 1.2)
+        draw.ellipse((left, y, left + avatar, y + avatar), fill=tuple(rng.randint(60, 220) for _ in range(3)))
+        draw.text((left + avatar + text_height // 2, y), f"[{rng.choice(SQUADS)}] {name}", font=font, fill=(220, 221, 222))
+    for line in range(3):
+        draw.text((width // 2, height - (line + 2) * row_height), f"chat message {rng.randint(1, 99)} from someone",
+                  font=hud_font, fill=(150, 150, 150))
+    pixels = np.asarray(image, dtype=np.int16)
+    if noise:
+        pixels = pixels + np.random.default_rng(rng.randint(0, 2**31)).normal(0, noise, pixels.shape).astype(np.int16)
+    return np.clip(pixels, 0, 255).astype(np.uint8), shown
+
+def build_benchmark_corpus(names, count, seed=7):
+    rng = random.Random(seed)
+    sizes = [(1280, 720), (1920, 1080), (2560, 1440), (3840, 2160)]
+    noises = [0, 6, 14]
+    corpus = []
+    for index in range(count):
+        canvas_size = sizes[index % len(sizes)]
+        text_height = int(canvas_size[1] / 1080 * rng.choice([14, 16, 18, 22]))
+        noise = noises[(index // len(sizes)) % len(noises)]
+        sample = rng.sample(names, min(len(names), rng.randint(5, 40)))
+        image, truth = render_synthetic_screenshot(sample, rng, canvas_size, text_height, noise)
+        corpus.append({"image": image, "truth": truth, "size": f"{canvas_size[0]}x{canvas_size[1]}",
+                       "text_height": text_height, "noise": noise})
+    return corpus
+
+def percentiles(values):
+    if not values:
+        return {}
+    return {f"p{q}": round(float(np.percentile(values, q)), 1) for q in (50, 90, 99)}
+
+def run_benchmark(reader, corpus, roster, settings):
+    settings = dict(settings, ocr_cache=False)
+    rows = []
+    for sample in corpus:
+        image = sample["image"]
+        q_image = QImage(image.data, image.shape[1], image.shape[0], image.strides[0], QImage.Format.Format_RGB888)
+        trace = PipelineTrace("benchmark")
+        with trace.stage("convert"):
+            image_data, _owner = qimage_to_numpy(q_image)
+        usernames, stats = extract_usernames(reader, image_data, settings, trace=trace)
+        extract_ms = (time.perf_counter() - trace.start) * 1000
+        start = time.perf_counter()
+        corrected = []
+        for name in usernames:
+            if roster and name not in roster:
+                potential_matches = roster.get_close_matches(name, n=1, cutoff=SIMILARITY_THRESHOLD)
+                corrected.append(potential_matches[0][0] if potential_matches else name)
+            else:
+                corrected.append(name)
+        match_ms = (time.perf_counter() - start) * 1000
+        truth = set(sample["truth"])
+        rows.append({
+            "size": sample["size"], "text_height": sample["text_height"], "noise": sample["noise"],
+            "extract_ms": extract_ms, "preprocess_ms": stats["preprocess_ms"], "ocr_ms": stats["ocr_ms"], "match_ms": match_ms,
+            "stages": trace.summary(),
+            "truth": len(truth), "found": len(set(usernames)), "correct": len(truth & set(usernames)),
+            "correct_after_suggestions": len(truth & set(corrected)), "found_after_suggestions": len(set(corrected)),
+        })
+    return rows
+
+def summarize_benchmark(rows):
+    def accuracy(subset, suffix=""):
+        truth = sum(row["truth"] for row in subset)
+        found = sum(row["found" + suffix] for row in subset)
+        correct = sum(row["correct" + suffix] for row in subset)
+        return {"precision": round(correct / found, 3) if found else 0.0, "recall": round(correct / truth, 3) if truth else 0.0}
+
+    def summary(subset):
+        return {
+            "images": len(subset),
+            "extract_ms": percentiles([row["extract_ms"] for row in subset]),
+            "ocr_ms": percentiles([row["ocr_ms"] for row in subset]),
+            "preprocess_ms": percentiles([row["preprocess_ms"] for row in subset]),
+            "match_ms": percentiles([row["match_ms"] for row in subset]),
+            "stages_ms": {name: percentiles([row["stages"].get(name, 0.0) for row in subset])
+                          for name in dict.fromkeys(name for row in subset for name in row["stages"])},
+            "ocr": accuracy(subset),
+            "with_suggestions": accuracy(subset, "_after_suggestions"),
+        }
+
+    report = {"overall": summary(rows), "by_size": {}, "by_noise": {}}
+    for key, group in (("size", "by_size"), ("noise", "by_noise")):
+        for value in sorted({row[key] for row in rows}, key=str):
+            report[group][str(value)] = summary([row for row in rows if row[key] == value])
+    report["peak_memory_mb"] = round(resident_memory_mb(peak=True), 1)
+    return report
+
+def verify_backend(backend, corpus, settings, lexicon=None):
+    runs = {}
+    for name in ("torch-int8", backend):
+        run_settings = dict(settings, ocr_backend=name, ocr_cache=False)
+        start = time.perf_counter()
+        reader = create_ocr_reader(run_settings, lexicon)
+        load_s = time.perf_counter() - start
+        outputs, extract_ms, recognize_ms = [], [], []
+        for sample in corpus:
+            trace = PipelineTrace(name)
+            usernames, stats = extract_usernames(reader, sample["image"], run_settings, trace=trace)
+            outputs.append(usernames)
+            extract_ms.append((time.perf_counter() - trace.start) * 1000)
+            recognize_ms.append(trace.stage_ms("recognize"))
+        runs[name] = {"load_s": round(load_s, 2), "extract_ms": percentiles(extract_ms),
+                      "recognize_ms": percentiles(recognize_ms), "outputs": outputs}
+        del reader
+        release_ocr_memory()
+    reference, candidate = runs["torch-int8"], runs[backend]
+    mismatches = [{"image": index, "reference": expected, "candidate": got}
+                  for index, (expected, got) in enumerate(zip(reference.pop("outputs"), candidate.pop("outputs")))
+                  if expected != got]
+    return {
+        "backend": backend,
+        "images": len(corpus),
+        "matching_images": len(corpus) - len(mismatches),
+        "recognize_speedup": round(reference["recognize_ms"]["p50"] / max(candidate["recognize_ms"]["p50"], 0.1), 2),
+        "reference": reference,
+        "candidate": candidate,
+        "mismatches": mismatches,
+    }
+
+def qimage_to_numpy(q_image):
+    if q_image.format() != QImage.Format.Format_RGB888:
+        q_image = q_image.convertToFormat(QImage.Format.Format_RGB888)
+    width, height, stride = q_image.width(), q_image.height(), q_image.bytesPerLine()
+    bits = q_image.constBits()
+    bits.setsize(q_image.sizeInBytes())
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(height, stride)
+    return rows[:, :width * 3].reshape(height, width, 3), q_image
+
+def find_row_bands(ink, min_height=4, max_gap=1):
+    rows = np.flatnonzero(ink.sum(axis=1) > max(2, ink.shape[1] // 500))
+    if not len(rows):
+        return []
+    breaks = np.flatnonzero(np.diff(rows) > max_gap + 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+    return [(int(start), int(end)) for start, end in zip(starts, ends) if end - start >= min_height]
+
+def ink_mask(gray):
+    background = np.median(gray[::4, ::4])
+    return np.abs(gray.astype(np.int16) - int(background)) > 40
+
+def to_grayscale(image_data):
+    if image_data.ndim == 2:
+        return image_data
+    weighted = image_data[..., 0].astype(np.uint16) * 77
+    weighted += image_data[..., 1].astype(np.uint16) * 150
+    weighted += image_data[..., 2].astype(np.uint16) * 29
+    return (weighted >> 8).astype(np.uint8)
+
+def find_list_region(image_data):
+    height, width = image_data.shape[:2]
+    step = max(1, min(height, width) // 1000)
+    ink = ink_mask(to_grayscale(image_data[::step, ::step]))
+    bands = find_row_bands(ink, min_height=max(2, 6 // step))
+    if len(bands) < 2:
+        return None
+    text_height = float(np.median([end - start for start, end in bands]))
+    groups = [[bands[0]]]
+    for band in bands[1:]:
+        if band[0] - groups[-1][-1][1] <= 2.5 * text_height:
+            groups[-1].append(band)
+        else:
+            groups.append([band])
+    group = max(groups, key=lambda g: (len(g), g[-1][1] - g[0][0]))
+    if len(group) < 2:
+        return None
+    top, bottom = group[0][0], group[-1][1]
+    columns = np.flatnonzero(ink[top:bottom].any(axis=0)).tolist()
+    margin = int(text_height)
+    box = (max(0, (top - margin) * step), min(height, (bottom + margin) * step),
+           max(0, (columns[0] - margin) * step), min(width, (columns[-1] + 1 + margin) * step))
+    return box, text_height * step
+
+def preprocess_image(image_data, settings):
+    start = time.perf_counter()
+    height, width = image_data.shape[:2]
+    stats = {"pixels_before": height * width, "crop": None, "scale": 1.0}
+    if not settings["preprocess"]:
+        stats.update(pixels_after=height * width, preprocess_ms=0.0)
+        return image_data, stats
+    region = find_list_region(image_data)
+    if region:
+        (top, bottom, left, right), text_height = region
+        if settings["preprocess_crop"]:
+            image_data = image_data[top:bottom, left:right]
+            stats["crop"] = [left, top, right, bottom]
+        scale = min(2.0, settings["preprocess_text_height"] / text_height)
+        if abs(scale - 1.0) > 0.1:
+            stats["scale"] = round(scale, 3)
+    if settings["preprocess_grayscale"]:
+        image_data = to_grayscale(image_data)
+    if stats["scale"] != 1.0:
+        new_size = (max(1, round(image_data.shape[1] * stats["scale"])), max(1, round(image_data.shape[0] * stats["scale"])))
+        image_data = np.asarray(Image.fromarray(np.ascontiguousarray(image_data)).resize(new_size, Image.Resampling.LANCZOS))
+    stats["pixels_after"] = image_data.shape[0] * image_data.shape[1]
+    stats["preprocess_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return image_data, stats
+
+def column_segments(ink, max_gap):
+    columns = np.flatnonzero(ink.any(axis=0))
+    if not len(columns):
+        return []
+    gaps = np.flatnonzero(np.diff(columns) > max_gap)
+    starts = np.concatenate(([columns[0]], columns[gaps + 1]))
+    ends = np.concatenate((columns[gaps], [columns[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+def find_text_boxes(gray):
+    ink = ink_mask(gray)
+    bands = find_row_bands(ink)
+    if len(bands) < 2:
+        return None
+    text_height = float(np.median([end - start for start, end in bands]))
+    lines = []
+    for top, bottom in bands:
+        for left, right in column_segments(ink[top:bottom], 0.6 * text_height):
+            for line_top, line_bottom in find_row_bands(ink[top:bottom, left:right], min_height=1) or [(0, bottom - top)]:
+                line_ink = ink[top + line_top:top + line_bottom, left:right]
+                for segment_left, segment_right in column_segments(line_ink, 0.6 * text_height):
+                    lines.append((top + line_top, top + line_bottom, left + segment_left, left + segment_right))
+    heights = np.array([line_bottom - line_top for line_top, line_bottom, _, _ in lines])
+    if (heights > 1.6 * text_height).any() or np.mean(heights > 0.6 * text_height) < 0.8:
+        return None
+    image_height, image_width = gray.shape
+    margin = max(1, int(0.15 * text_height))
+    boxes = []
+    for line_top, line_bottom, left, right in lines:
+        if right - left < 1.6 * text_height and ink[line_top:line_bottom, left:right].mean() > 0.55:
+            continue
+        boxes.append([max(0, left - margin), min(image_width, right + margin),
+                      max(0, line_top - margin), min(image_height, line_bottom + margin)])
+    return boxes or None
+
+def row_thumbnails(gray, ink, bands):
+    thumbnails = np.zeros((len(bands), 8, 64), dtype=np.uint8)
+    for index, (top, bottom) in enumerate(bands):
+        columns = np.flatnonzero(ink[top:bottom].any(axis=0))
+        band = np.ascontiguousarray(gray[top:bottom, columns[0]:columns[-1] + 1])
+        thumbnails[index] = np.asarray(Image.fromarray(band).resize((64, 8), Image.Resampling.BOX))
+    return thumbnails
+
+def row_signatures(gray, ink, bands):
+    return [hashlib.blake2b((thumbnail >> 5).tobytes(), digest_size=8).hexdigest()
+            for thumbnail in row_thumbnails(gray, ink, bands)]
+
+def crop_to_rows(image_data, bands, fresh):
+    if not bands:
+        return image_data, 0
+    if not fresh:
+        return None, len(bands)
+    first, last = fresh[0], fresh[-1]
+    top = (bands[first - 1][1] + bands[first][0]) // 2 if first > 0 else 0
+    bottom = (bands[last][1] + bands[last + 1][0]) // 2 if last + 1 < len(bands) else image_data.shape[0]
+    return image_data[top:bottom], len(bands) - (last - first + 1)
+
+def crop_to_list(image_data, settings):
+    # Row overlap is judged inside the attendee list only, so a HUD or chat change elsewhere
+    # in the screenshot does not count as a new row.
+    region = find_list_region(image_data) if settings["preprocess_crop"] else None
+    if not region:
+        return image_data
+    top, bottom, left, right = region[0]
+    return image_data[top:bottom, left:right]
+
+def crop_to_new_rows(image_data, seen_signatures):
+    gray = to_grayscale(image_data)
+    ink = ink_mask(gray)
+    bands = find_row_bands(ink)
+    signatures = row_signatures(gray, ink, bands)
+    fresh = [index for index, signature in enumerate(signatures) if signature not in seen_signatures]
+    return crop_to_rows(image_data, bands, fresh) + (signatures,)
+
+def row_distances(thumbnails, others):
+    return np.abs(thumbnails[:, None].astype(np.int16) - others[None].astype(np.int16)).mean(axis=2).max(axis=2)
+
+def list_row_thumbnails(image_data, settings):
+    gray = to_grayscale(crop_to_list(image_data, settings))
+    ink = ink_mask(gray)
+    return row_thumbnails(gray, ink, find_row_bands(ink))
+
+def same_rows(thumbnails, others, tolerance=16):
+    return thumbnails.shape == others.shape and bool((np.diagonal(row_distances(thumbnails, others)) <= tolerance).all())
+
+def crop_to_changed_rows(image_data, seen_thumbnails, tolerance=16):
+    # Video frames are re-encoded (GIFs get a new palette per frame), so exact row hashes
+    # rarely repeat. A row counts as seen when some earlier row thumbnail is within
+    # tolerance in every column; re-rendered rows differ by a few levels, different names by 30+.
+    gray = to_grayscale(image_data)
+    ink = ink_mask(gray)
+    bands = find_row_bands(ink)
+    thumbnails = row_thumbnails(gray, ink, bands)
+    if len(seen_thumbnails) and len(bands):
+        fresh = np.flatnonzero(row_distances(thumbnails, seen_thumbnails).min(axis=1) > tolerance).tolist()
+    else:
+        fresh = list(range(len(bands)))
+    return crop_to_rows(image_data, bands, fresh) + (thumbnails,)
+
+def describe_preprocess(stats):
+    return (f"{stats['pixels_before'] / 1e6:.2f}M → {stats['pixels_after'] / 1e6:.2f}M px "
+            f"in {stats['preprocess_ms']:.0f} ms")
+
+def perceptual_hash(image_data, size=16):
+    step = max(1, min(image_data.shape[:2]) // (size * 8))
+    thumbnail = Image.fromarray(np.ascontiguousarray(to_grayscale(image_data[::step, ::step])))
+    pixels = np.asarray(thumbnail.resize((size + 1, size), Image.Resampling.BOX), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+class OcrCache:
+    # Raw readtext results and parsed usernames stored as one JSON file per screenshot,
+    # named <settings hash>-<pixel hash>-<perceptual hash>.json. File mtimes double as
+    # the LRU order: hits touch the file and writes evict the oldest files over the limit.
+    def __init__(self, directory, max_bytes, perceptual=False, max_distance=6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.perceptual = perceptual
+        self.max_distance = max_distance
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, settings):
+        if not settings["ocr_cache"]:
+            return None
+        try:
+            return cls(os.path.join(user_cache_dir(), 'ocr'), settings["ocr_cache_mb"] * 1024 * 1024,
+                       settings["ocr_cache_perceptual"], settings["ocr_cache_max_distance"])
+        except OSError as e:
+            print(f"WARNING: OCR cache disabled ({e}).")
+            return None
+
+    def key_for(self, image_data, settings, lexicon_digest=None):
+        # With roster-aware decoding the results also depend on the roster contents.
+        options = {name: settings[name] for name in OCR_SETTING_KEYS}
+        if settings["ocr_decoder"] == "wordbeamsearch":
+            options["lexicon"] = lexicon_digest
+        fingerprint = json.dumps(options, sort_keys=True)
+        settings_hash = hashlib.blake2b(fingerprint.encode(), digest_size=4).hexdigest()
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{image_data.shape}{image_data.dtype}".encode())
+        for row in image_data:
+            digest.update(np.ascontiguousarray(row))
+        phash = perceptual_hash(image_data) if self.perceptual else 0
+        rows = list_row_thumbnails(image_data, settings) if self.perceptual else None
+        return settings_hash, digest.hexdigest(), phash, rows
+
+    def get(self, key):
+        settings_hash, content_hash, phash, rows = key
+        path = self._path(key)
+        if os.path.exists(path):
+            return self._load(path)
+        for path in self._find_similar(settings_hash, phash) if self.perceptual else []:
+            # A near hash only narrows the search: lists that differ by one attendee hash a
+            # bit or two apart, so the hit must also show the same rows as this screenshot.
+            entry = self._load(path)
+            if entry and "rows" in entry:
+                cached_rows = np.frombuffer(base64.b64decode(entry["rows"]), dtype=np.uint8).reshape(-1, 8, 64)
+                if same_rows(rows, cached_rows):
+                    return entry
+        return None
+
+    def _load(self, path):
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, entry):
+        path = self._path(key)
+        if key[3] is not None:
+            entry = dict(entry, rows=base64.b64encode(key[3].tobytes()).decode())
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, path)
+            self._evict()
+        except OSError as e:
+            print(f"WARNING: Could not write OCR cache entry ({e}).")
+
+    def _path(self, key):
+        settings_hash, content_hash, phash, _ = key
+        return os.path.join(self.directory, f"{settings_hash}-{content_hash}-{phash:064x}.json")
+
+    def _find_similar(self, settings_hash, phash):
+        candidates = []
+        for name in os.listdir(self.directory):
+            parts = name[:-len(".json")].split('-')
+            if not name.endswith(".json") or len(parts) != 3 or parts[0] != settings_hash:
+                continue
+            distance = bin(int(parts[2], 16) ^ phash).count('1')
+            if distance <= self.max_distance:
+                candidates.append((distance, os.path.join(self.directory, name)))
+        return [path for _, path in sorted(candidates)]
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+class PipelineTrace:
+    # Wall-clock time and resident memory for each stage of one extraction. Stages are
+    # stored as plain data so traces can cross Qt signals and be exported as Chrome trace events.
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        memory_before = resident_memory_mb()
+        try:
+            yield
+        finally:
+            memory_after = resident_memory_mb()
+            self.stages.append({
+                "name": name,
+                "start_us": round((start - STARTUP_T0) * 1e6),
+                "ms": round((time.perf_counter() - start) * 1000, 2),
+                "memory_mb": round(memory_after, 1),
+                "memory_delta_mb": round(memory_after - memory_before, 1),
+                "thread": threading.get_ident(),
+            })
+
+    def stage_ms(self, name):
+        return round(sum(stage["ms"] for stage in self.stages if stage["name"] == name), 1)
+
+    def summary(self):
+        summary = {}
+        for stage in self.stages:
+            summary[stage["name"]] = round(summary.get(stage["name"], 0.0) + stage["ms"], 1)
+        return summary
+
+    def to_dict(self):
+        return {"name": self.name, "time": time.time(), "total_ms": round((time.perf_counter() - self.start) * 1000, 1),
+                "peak_memory_mb": round(resident_memory_mb(peak=True), 1), "stages": self.stages}
+
+def describe_stages(summary):
+    return " · ".join(f"{name} {ms:.0f}" for name, ms in summary.items()) + " ms"
+
+def traces_to_chrome(traces):
+    events = []
+    for trace in traces:
+        for stage in trace["stages"]:
+            events.append({"name": stage["name"], "cat": trace["name"], "ph": "X", "ts": stage["start_us"],
+                           "dur": round(stage["ms"] * 1000), "pid": os.getpid(), "tid": stage["thread"],
+                           "args": {"memory_mb": stage["memory_mb"], "memory_delta_mb": stage["memory_delta_mb"]}})
+            events.append({"name": "resident memory", "ph": "C", "ts": stage["start_us"] + round(stage["ms"] * 1000),
+                           "pid": os.getpid(), "args": {"MB": stage["memory_mb"]}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+class JobCancelled(Exception):
+    pass
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled()
+
+class OcrJobQueue:
+    # A single worker thread runs jobs one at a time so only one readtext call ever
+    # touches the reader. Submitting a coalescing job drops any coalescing job still
+    # waiting; cancelling sets the running job's event, which extraction checks between stages.
+    def __init__(self, handler, on_done):
+        self.handler = handler
+        self.on_done = on_done
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.running = None
+        self.last_id = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, payload, coalesce=True):
+        with self.condition:
+            self.last_id += 1
+            if coalesce:
+                self.pending = deque(job for job in self.pending if not job["coalesce"])
+            self.pending.append({"id": self.last_id, "payload": payload, "coalesce": coalesce,
+                                 "submitted": time.perf_counter(), "cancelled": threading.Event()})
+            self.condition.notify()
+            return self.last_id
+
+    def cancel_all(self):
+        with self.condition:
+            count = len(self.pending)
+            self.pending.clear()
+            if self.running:
+                self.running["cancelled"].set()
+                count += 1
+            return count
+
+    def depth(self):
+        with self.condition:
+            return len(self.pending) + (1 if self.running else 0)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                job = self.pending.popleft()
+                self.running = job
+            try:
+                result = self.handler(job)
+            finally:
+                with self.condition:
+                    self.running = None
+            self.on_done(job, result)
+
+class OnnxRecognizer:
+    # Stands in for the torch recognizer inside easyocr's recognizer_predict, which only
+    # calls eval() and model(image, text) and expects a tensor of logits back.
+    def __init__(self, path, threads):
+        import onnxruntime
+        self.path = path
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def eval(self):
+        return self
+
+    def __call__(self, image, text=None):
+        import torch
+        return torch.from_numpy(self.session.run(None, {"image": image.cpu().numpy()})[0])
+
+def export_recognizer_onnx(recognizer, quantize):
+    import torch
+    import onnxruntime
+    digest = hashlib.blake2b(digest_size=8)
+    for tensor in recognizer.state_dict().values():
+        digest.update(tensor.cpu().numpy().tobytes())
+    model_dir = os.path.join(user_cache_dir(), 'models')
+    path = os.path.join(model_dir, f"recognizer-{digest.hexdigest()}{'-int8' if quantize else ''}.onnx")
+    if os.path.exists(path):
+        return path
+    os.makedirs(model_dir, exist_ok=True)
+
+    class ImageOnlyRecognizer(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, image):
+            # AdaptiveAvgPool2d((None, 1)) over the permuted features is a mean over the last axis,
+            # written out because the exporter cannot handle adaptive pooling with a dynamic width.
+            features = self.model.FeatureExtraction(image).permute(0, 3, 1, 2).mean(dim=3)
+            return self.model.Prediction(self.model.SequenceModeling(features).contiguous())
+
+    fp32_path = path.replace('-int8', '') if quantize else path
+    if not os.path.exists(fp32_path):
+        torch.onnx.export(ImageOnlyRecognizer(recognizer).eval(), torch.zeros(1, 1, 64, 256), fp32_path + ".tmp",
+                          input_names=["image"], output_names=["logits"],
+                          dynamic_axes={"image": {0: "batch", 3: "width"}, "logits": {0: "batch", 1: "steps"}},
+                          opset_version=17, dynamo=False)
+        os.replace(fp32_path + ".tmp", fp32_path)
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(fp32_path, path + ".tmp", weight_type=QuantType.QInt8, op_types_to_quantize=["MatMul", "LSTM", "Gemm"])
+        os.replace(path + ".tmp", path)
+    return path
+
+def set_ocr_lexicon(reader, lexicon):
+    # The wordbeamsearch decoder only tests its candidate words with `in`, so the
+    # roster matcher can stand in for EasyOCR's English word list.
+    if not hasattr(reader, 'default_lexicon'):
+        reader.default_lexicon = reader.converter.dict_list
+    reader.converter.dict_list = lexicon if lexicon else reader.default_lexicon
+    reader.lexicon_digest = getattr(lexicon, 'digest', None) if lexicon else None
+
+def create_ocr_reader(settings=None, lexicon=None):
+    settings = settings or DEFAULT_SETTINGS
+    backend = settings["ocr_backend"]
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{backend}'. Choose one of: {', '.join(OCR_BACKENDS)}.")
+    if settings["ocr_decoder"] not in OCR_DECODERS:
+        raise ValueError(f"Unknown OCR decoder '{settings['ocr_decoder']}'. Choose one of: {', '.join(OCR_DECODERS)}.")
+    import torch
+    import easyocr
+    if settings["ocr_threads"] > 0:
+        torch.set_num_threads(settings["ocr_threads"])
+    cache_path = warm_reader_path(settings) if settings["ocr_warm_start"] else None
+    reader = load_warm_reader(cache_path, settings["ocr_threads"]) if cache_path else None
+    if reader is None:
+        reader = easyocr.Reader(['en'], quantize=backend == "torch-int8")
+        reader.warm_start = False
+        reader.fallback_reason = None
+        if backend.startswith("onnx") and reader.device == 'cpu':
+            try:
+                path = export_recognizer_onnx(reader.recognizer, backend == "onnx-int8")
+                reader.recognizer = OnnxRecognizer(path, settings["ocr_threads"])
+            except (ImportError, TypeError, RuntimeError) as e:
+                # Fall back to the default torch-int8 models (quantized in place, as
+                # easyocr.Reader(quantize=True) does) rather than the slower float32 ones.
+                torch.quantization.quantize_dynamic(reader.detector, dtype=torch.qint8, inplace=True)
+                torch.quantization.quantize_dynamic(reader.recognizer, dtype=torch.qint8, inplace=True)
+                reader.fallback_reason = f"{backend} unavailable ({e}), using torch-int8"
+                print(f"WARNING: ONNX backend {reader.fallback_reason}.")
+        if cache_path and not reader.fallback_reason:
+            save_warm_reader(reader, cache_path)
+    set_ocr_lexicon(reader, lexicon)
+    return reader
+
+def warm_reader_path(settings):
+    # Keyed by everything that changes what easyocr.Reader would build, including the
+    # model files themselves, so a stale snapshot is never loaded.
+    import torch
+    import easyocr
+    from easyocr.config import MODULE_PATH
+    parts = [easyocr.__version__, torch.__version__, sys.version.split()[0], settings["ocr_backend"], str(torch.cuda.is_available())]
+    model_dir = os.path.join(MODULE_PATH, 'model')
+    if os.path.isdir(model_dir):
+        for name in sorted(os.listdir(model_dir)):
+            st = os.stat(os.path.join(model_dir, name))
+            parts.append(f"{name}:{st.st_size}:{st.st_mtime_ns}")
+    digest = hashlib.blake2b('\n'.join(parts).encode(), digest_size=8).hexdigest()
+    return os.path.join(user_cache_dir(), 'models', f"reader-{settings['ocr_backend']}-{digest}.pt")
+
+def warm_reader_key():
+    # Per-user secret kept outside the cache folder. Snapshots are pickles, so one is only
+    # loaded if it carries a MAC made with this key, not just because it sits in the cache.
+    path = os.path.join(user_data_dir(), 'warm_start.key')
+    try:
+        with open(path, 'rb') as f:
+            key = f.read()
+        if len(key) == 32:
+            return key
+    except OSError:
+        pass
+    key = os.urandom(32)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+        f.write(key)
+    os.replace(temp_path, path)
+    return key
+
+def warm_reader_mac(path, key):
+    mac = hashlib.blake2b(key=key, digest_size=32)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            mac.update(chunk)
+    return mac.hexdigest()
+
+def load_warm_reader(path, threads):
+    if not os.path.exists(path):
+        return None
+    import torch
+    try:
+        with open(f"{path}.sig") as f:
+            expected = f.read().strip()
+        if not hmac.compare_digest(warm_reader_mac(path, warm_reader_key()), expected):
+            raise ValueError("signature mismatch")
+        # mmap=True maps the weights instead of reading them, so loading is close to free.
+        state = torch.load(path, mmap=True, weights_only=False)
+        reader = state["reader"]
+        if state["onnx_model"]:
+            reader.recognizer = OnnxRecognizer(state["onnx_model"], threads)
+    except Exception as e:
+        print(f"WARNING: Could not load the cached OCR model ({e}). Rebuilding it.")
+        for stale in (path, f"{path}.sig"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        return None
+    reader.warm_start = True
+    return reader
+
+def save_warm_reader(reader, path):
+    import torch
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    # The ONNX session cannot be pickled, and classes from this script would pickle under
+    # a module name that batch workers do not share, so only the model path is stored.
+    recognizer = reader.recognizer
+    onnx_model = recognizer.path if isinstance(recognizer, OnnxRecognizer) else None
+    try:
+        if onnx_model:
+            reader.recognizer = None
+        torch.save({"reader": reader, "onnx_model": onnx_model}, temp_path)
+        with open(f"{path}.sig", 'w') as f:
+            f.write(warm_reader_mac(temp_path, warm_reader_key()))
+        os.replace(temp_path, path)
+    except (OSError, RuntimeError, pickle.PicklingError) as e:
+        print(f"WARNING: Could not cache the OCR model ({e}).")
+        return
+    finally:
+        reader.recognizer = recognizer
+    # Only older snapshots of the same backend are removed, so a GUI and a server (or
+    # --verify-backend) on different backends keep their own. Snapshots named before the
+    # backend was part of the name can no longer be loaded and go as well.
+    prefix = os.path.basename(path).rsplit('-', 1)[0] + '-'
+    for name in os.listdir(os.path.dirname(path)):
+        stale = os.path.join(os.path.dirname(path), name)
+        same_backend = name.startswith(prefix) and re.fullmatch(r'[0-9a-f]{16}\.pt(\.sig)?', name[len(prefix):])
+        if (same_backend or re.fullmatch(r'reader-[0-9a-f]{16}\.pt', name)) and stale not in (path, f"{path}.sig"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+def split_into_strips(image_data, count, min_rows):
+    # Cuts a tall list between rows into up to `count` strips of at least min_rows rows.
+    # Each strip reaches one row into its neighbours, so a row at a cut is read whole
+    # somewhere; only text centred inside a strip's own part of the list is kept from it.
+    bands = find_row_bands(ink_mask(to_grayscale(image_data)))
+    count = min(count, len(bands) // max(1, min_rows))
+    if count < 2:
+        return None
+    height = image_data.shape[0]
+    pitch = int(np.median(np.diff([start for start, _ in bands])))
+    splits = [len(bands) * k // count for k in range(1, count)]
+    cuts = [0] + [(bands[split - 1][1] + bands[split][0]) // 2 for split in splits] + [height]
+    strips = []
+    for top, bottom in zip(cuts, cuts[1:]):
+        strip_top, strip_bottom = max(0, top - pitch), min(height, bottom + pitch)
+        strips.append((np.ascontiguousarray(image_data[strip_top:strip_bottom]), strip_top, top, bottom))
+    return strips
+
+def run_readtext(reader, image_data, trace, settings=None):
+    return run_readtext_batch(reader, [image_data], [trace], settings)[0]
+
+def run_readtext_batch(reader, images, traces, settings=None):
+    # Images whose rows are found directly only need recognition. On a GPU the rest go
+    # through the detector together, one batch per image shape, as readtext_batched does;
+    # on the CPU a stacked batch was slower than one image at a time, so they stay separate.
+    from easyocr.utils import reformat_input
+    settings = settings or DEFAULT_SETTINGS
+    decode_options = {"decoder": settings["ocr_decoder"], "allowlist": OCR_ALLOWLIST if settings["ocr_allowlist"] else None}
+    results, prepared, by_shape = [None] * len(images), [], {}
+    for index, (image_data, trace) in enumerate(zip(images, traces)):
+        img, img_cv_grey = reformat_input(image_data)
+        prepared.append((img, img_cv_grey))
+        if settings["layout_mode"] == "auto":
+            with trace.stage("layout"):
+                boxes = find_text_boxes(img_cv_grey)
+            if boxes:
+                with trace.stage("recognize"):
+                    results[index] = reader.recognize(img_cv_grey, boxes, [], reformat=False, **decode_options)
+                continue
+        by_shape.setdefault(img.shape if reader.device != 'cpu' else index, []).append(index)
+    for indexes in by_shape.values():
+        with ExitStack() as stack:
+            for index in indexes:
+                stack.enter_context(traces[index].stage("detect"))
+            batch = prepared[indexes[0]][0] if len(indexes) == 1 else np.stack([prepared[index][0] for index in indexes])
+            horizontal_lists, free_lists = reader.detect(batch, reformat=False)
+        for index, horizontal_list, free_list in zip(indexes, horizontal_lists, free_lists):
+            with traces[index].stage("recognize"):
+                results[index] = reader.recognize(prepared[index][1], horizontal_list, free_list, reformat=False, **decode_options)
+    return results
+
+def parse_username_rows(results):
+    # Groups recognized fragments into list rows by their box centres and reads each row
+    # on its own, so a rank bracket can never pair with a name from the next row. A row
+    # whose bracket was lost is only read if it lies between bracketed rows and has a word
+    # starting in the username column learned from them. Word positions inside a fragment
+    # are estimated from their character offset. Each name carries the recognizer's
+    # confidence for the fragment it was read from.
+    if not results:
+        return [], []
+    boxes = np.array([np.asarray(box, dtype=np.float64).reshape(-1, 2) for box, _, _ in results])
+    lefts, rights = boxes[:, :, 0].min(axis=1), boxes[:, :, 0].max(axis=1)
+    tops, bottoms = boxes[:, :, 1].min(axis=1), boxes[:, :, 1].max(axis=1)
+    centres = (tops + bottoms) / 2
+    line_height = max(1.0, float(np.median(bottoms - tops)))
+    by_centre = np.argsort(centres, kind="stable")
+    row_ids = np.empty(len(results), dtype=np.int64)
+    row_ids[by_centre] = np.concatenate(([0], np.cumsum(np.diff(centres[by_centre]) > 0.5 * line_height)))
+    order = np.lexsort((lefts, row_ids))
+    bracketed, word = re.compile(USERNAME_PATTERN), re.compile(r'[a-zA-Z0-9_]+')
+    rows = []
+    for members in np.split(order, np.flatnonzero(np.diff(row_ids[order])) + 1):
+        fragments = [(float(lefts[i]), float(rights[i]), results[i][1].strip(), float(results[i][2]))
+                     for i in members if results[i][1].strip()]
+        if fragments:
+            text = " ".join(fragment for _, _, fragment, _ in fragments)
+            words = [(left + (right - left) * match.start() / len(fragment), match.group(), confidence)
+                     for left, right, fragment, confidence in fragments for match in word.finditer(fragment)]
+            rows.append({"text": text, "words": words, "names": bracketed.findall(text)})
+    for row in rows:
+        row["found"] = [next(entry for entry in row["words"] if entry[1] == name) for name in row["names"]]
+    name_lefts = [x for row in rows for x, _, _ in row["found"]]
+    name_left = float(np.median(name_lefts)) if name_lefts else None
+    listed = [index for index, row in enumerate(rows) if row["names"]]
+    usernames, parsed = [], []
+    for index, row in enumerate(rows):
+        found, source = row["found"], "bracket"
+        if not found and name_left is not None and listed[0] < index < listed[-1]:
+            found, source = [entry for entry in row["words"]
+                             if abs(entry[0] - name_left) <= line_height and is_valid_roblox_username(entry[1])][:1], "column"
+        for _, name, confidence in found:
+            usernames.append(name)
+            parsed.append({"username": name, "text": row["text"], "source": source, "confidence": round(confidence, 3)})
+    return usernames, parsed
+
+def extract_usernames(reader, image_data, settings, cache=None, cancel_event=None, trace=None, tiler=None):
+    if isinstance(reader, RemoteExtractor):
+        return reader.extract(image_data, trace)
+    return extract_usernames_batch(reader, [image_data], settings, cache, cancel_event, [trace or PipelineTrace("extract")], tiler)[0]
+
+def extract_usernames_batch(reader, images, settings, cache=None, cancel_event=None, traces=None, tiler=None):
+    traces = traces or [PipelineTrace("extract") for _ in images]
+    check_cancelled(cancel_event)
+    outputs, pending = [None] * len(images), []
+    for index, (image_data, trace) in enumerate(zip(images, traces)):
+        key = None
+        if cache:
+            with trace.stage("cache_lookup"):
+                key = cache.key_for(image_data, settings, getattr(reader, 'lexicon_digest', None))
+                entry = cache.get(key)
+            if entry:
+                stats = dict(entry["stats"], cache="hit", cache_ms=trace.stage_ms("cache_lookup"), stages=trace.summary())
+                outputs[index] = (entry["usernames"], stats)
+                continue
+        with trace.stage("preprocess"):
+            image_data, stats = preprocess_image(image_data, settings)
+        pending.append((index, image_data, stats, key))
+    check_cancelled(cancel_event)
+    tiled = {}
+    for index, image_data, stats, _ in pending if tiler else []:
+        strips = tiler.recognize(image_data, traces[index], cancel_event)
+        if strips:
+            tiled[index], stats["tiles"] = strips
+    untiled = [entry for entry in pending if entry[0] not in tiled]
+    batch_results = dict(zip([index for index, _, _, _ in untiled],
+                             run_readtext_batch(reader, [image_data for _, image_data, _, _ in untiled],
+                                                [traces[index] for index, _, _, _ in untiled], settings)))
+    check_cancelled(cancel_event)
+    for index, _, stats, key in pending:
+        trace = traces[index]
+        results = tiled[index] if index in tiled else batch_results[index]
+        stats["ocr_ms"] = round(trace.stage_ms("tile") + trace.stage_ms("layout") + trace.stage_ms("detect") + trace.stage_ms("recognize"), 1)
+        stats["layout"] = "tiles" if index in tiled else "detector" if "detect" in trace.summary() else "rows"
+        with trace.stage("parse"):
+            if settings["parse_mode"] == "rows":
+                usernames, stats["rows"] = parse_username_rows(results)
+            else:
+                full_text = ' '.join([res[1] for res in results])
+                usernames = re.findall(USERNAME_PATTERN, full_text)
+        if cache:
+            with trace.stage("cache_store"):
+                raw_results = [[[[float(x), float(y)] for x, y in box], text, float(confidence)] for box, text, confidence in results]
+                cache.put(key, {"results": raw_results, "usernames": usernames, "stats": stats})
+            stats["cache"] = "miss"
+        stats["stages"] = trace.summary()
+        outputs[index] = (usernames, stats)
+    return outputs
+
+def sample_video_frames(path, interval_s):
+    # Yields (seconds, RGB frame) about every interval_s, always including the last frame.
+    # GIFs are decoded with Pillow, other formats with OpenCV, which EasyOCR already depends on.
+    if path.lower().endswith('.gif'):
+        with Image.open(path) as animation:
+            elapsed, next_sample, pending = 0.0, 0.0, None
+            for frame in ImageSequence.Iterator(animation):
+                if elapsed >= next_sample:
+                    yield elapsed, np.array(frame.convert("RGB"))
+                    next_sample, pending = elapsed + interval_s, None
+                else:
+                    pending = (elapsed, np.array(frame.convert("RGB")))
+                # Browsers play frames shorter than 20 ms (often stored as 0) at 100 ms.
+                duration = frame.info.get("duration") or 0
+                elapsed += (duration if duration >= 20 else 100) / 1000
+            if pending:
+                yield pending
+        return
+    import cv2
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video '{os.path.basename(path)}'.")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        last_index = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) - 1
+        index, next_sample = 0, 0.0
+        while capture.grab():
+            elapsed = index / fps
+            if elapsed >= next_sample or index == last_index:
+                ok, frame = capture.retrieve()
+                if ok:
+                    yield elapsed, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    next_sample = elapsed + interval_s
+            index += 1
+    finally:
+        capture.release()
+
+def extract_usernames_from_video(reader, path, settings, cache=None, cancel_event=None, trace=None, progress=None):
+    # Sampled frames that look the same as the last one read are skipped, and of the rest
+    # only the rows not seen in an earlier frame are sent to OCR, as in append mode.
+    trace = trace or PipelineTrace("video")
+    usernames, seen_rows, previous = [], np.zeros((0, 8, 64), dtype=np.uint8), None
+    stats = {"video": True, "frames": 0, "unchanged_frames": 0, "ocr_passes": 0, "overlap_rows": 0}
+    frames = sample_video_frames(path, settings["video_sample_interval"])
+    while True:
+        with trace.stage("decode"):
+            sample = next(frames, None)
+        if sample is None:
+            break
+        check_cancelled(cancel_event)
+        frame = sample[1]
+        stats["frames"] += 1
+        with trace.stage("frame_diff"):
+            step = max(1, frame.shape[1] // 320)
+            thumbnail = to_grayscale(frame[::step, ::step]).astype(np.int16)
+            unchanged = (previous is not None and previous.shape == thumbnail.shape
+                         and np.count_nonzero(np.abs(thumbnail - previous) > 32) <= thumbnail.size * 0.0005)
+        if unchanged:
+            stats["unchanged_frames"] += 1
+            continue
+        previous = thumbnail
+        with trace.stage("overlap"):
+            fresh, overlap_rows, thumbnails = crop_to_changed_rows(crop_to_list(frame, settings), seen_rows)
+        stats["overlap_rows"] += overlap_rows
+        if fresh is not None:
+            names, _ = extract_usernames(reader, np.ascontiguousarray(fresh), settings, cache, cancel_event, trace)
+            usernames.extend(names)
+            seen_rows = np.concatenate([seen_rows, thumbnails])
+            stats["ocr_passes"] += 1
+        if progress:
+            progress(stats["frames"], stats["ocr_passes"])
+    stats["stages"] = trace.summary()
+    return list(dict.fromkeys(usernames)), stats
+
+def validate_log_fields(event_type, host, attendees):
+    error_messages = []
+    if not host:
+        error_messages.append("- Host name is missing.")
+    elif not is_valid_roblox_username(host):
+        error_messages.append(f"- Host username '{host}' is invalid.")
+
+    invalid_attendees = [name for name in attendees if not is_valid_roblox_username(name)]
+    if invalid_attendees:
+        error_list = "\n  - ".join(invalid_attendees)
+        error_messages.append(f"- The following attendee usernames are invalid:\n  - {error_list}")
+
+    num_attendees = len([name for name in attendees if name.lower() != host.lower()])
+    min_required = 1 if event_type == "Crate Run" else 2
+    if num_attendees < min_required:
+        plural_s = "" if min_required == 1 else "s"
+        error_messages.append(f"- A '{event_type}' requires at least {min_required} attendee{plural_s} (excluding host). You only have {num_attendees}.")
+    return error_messages
+
+def format_log_entry(event_type, squad, host, day, description, attendees):
+    final_attendees = [name for name in attendees if name.lower() != host.lower()]
+    attendees_string = "\n".join(final_attendees) if final_attendees else "N/A"
+    log_entry = (f"Event: {event_type}\n"
+                 f"Squad: {squad}\n"
+                 f"Host: {host}\n"
+                 f"Day: {day.lower()}\n"
+                 f"Description: {description.strip() or 'N/A'}\n"
+                 f"Attendees:\n{attendees_string}")
+    return log_entry.strip()
+
+def write_output(text, path, fallback_path):
+    if path == "-" and sys.stdout is not None:
+        print(text)
+        return
+    if path == "-":
+        path = fallback_path
+    with open(path, 'w') as f:
+        f.write(text + "\n")
+
+def write_startup_report(report, path):
+    write_output(json.dumps(report, indent=2), path, "startup_report.json")
+
+def user_data_dir():
+    base = os.environ.get('APPDATA') or os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'Themis SELA')
+
+def event_date_for_day(day, reference=None):
+    # Logs only carry a weekday, so they are dated to the latest such day on or before the reference date.
+    reference = reference or datetime.date.today()
+    return reference - datetime.timedelta(days=(reference.weekday() - DAYS.index(day.capitalize())) % 7)
+
+def current_week():
+    today = datetime.date.today()
+    return today - datetime.timedelta(days=today.weekday()), today
+
+LOG_FIELDS = {"Squad": "squad", "Host": "host", "Day": "day", "Description": "description", "Date": "date"}
+
+def parse_log_entries(text):
+    entries, entry, attendees = [], None, None
+    for line in text.splitlines():
+        line = line.strip()
+        field, separator, value = line.partition(':')
+        if separator and field == "Event":
+            entry, attendees = {"event_type": value.strip(), "attendees": []}, None
+            entries.append(entry)
+        elif entry is None:
+            continue
+        elif attendees is not None:
+            if is_valid_roblox_username(line):
+                attendees.append(line)
+            else:
+                entry, attendees = None, None
+        elif separator and field == "Attendees":
+            attendees = entry["attendees"]
+        elif separator and field in LOG_FIELDS:
+            entry[LOG_FIELDS[field]] = value.strip()
+    return entries
+
+class AttendanceStore:
+    # One events row per generated log and one attendance row per attendee. attendance
+    # is clustered by username, so one member's history is a single range scan, and
+    # date-range reports go through the event_date index.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY,
+            event_date TEXT NOT NULL,
+            day TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            squad TEXT NOT NULL,
+            host TEXT NOT NULL COLLATE NOCASE,
+            description TEXT NOT NULL,
+            attendee_count INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            recorded_at TEXT NOT NULL,
+            fingerprint TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS attendance (
+            username TEXT NOT NULL COLLATE NOCASE,
+            event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+            PRIMARY KEY (username, event_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS attendance_event ON attendance(event_id, username);
+        CREATE INDEX IF NOT EXISTS events_date ON events(event_date, squad);
+        CREATE INDEX IF NOT EXISTS events_host ON events(host, event_date);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(self.SCHEMA)
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings["history_db"] or os.path.join(user_data_dir(), 'attendance.sqlite3'))
+
+    def close(self):
+        self.db.close()
+
+    def _insert(self, event_type, squad, host, day, description, attendees, event_date, source):
+        attendees = list(dict.fromkeys(name for name in attendees if name.lower() != host.lower()))
+        log_entry = format_log_entry(event_type, squad, host, day, description, attendees)
+        fingerprint = hashlib.blake2b(f"{event_date.isoformat()}\n{log_entry}".encode(), digest_size=16).hexdigest()
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO events (event_date, day, event_type, squad, host, description, attendee_count,"
+            " source, recorded_at, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (event_date.isoformat(), day.capitalize(), event_type, squad, host, description.strip(), len(attendees),
+             source, datetime.datetime.now().isoformat(timespec='seconds'), fingerprint))
+        if not cursor.rowcount:
+            return None
+        self.db.executemany("INSERT OR IGNORE INTO attendance (username, event_id) VALUES (?, ?)",
+                            [(name, cursor.lastrowid) for name in attendees])
+        return cursor.lastrowid
+
+    def record(self, event_type, squad, host, day, description, attendees, event_date=None, source="app", replace_id=None):
+        # replace_id is the event recorded for the log being regenerated (after fixing the
+        # description or the attendee list); it is replaced instead of adding another event.
+        with self.db:
+            if replace_id is not None:
+                self.db.execute("DELETE FROM events WHERE id = ?", (replace_id,))
+            return self._insert(event_type, squad, host, day, description, attendees,
+                                event_date or event_date_for_day(day), source)
+
+    def import_logs(self, text, reference_date=None):
+        counts = {"imported": 0, "duplicates": 0, "skipped": 0}
+        with self.db:
+            for entry in parse_log_entries(text):
+                day = entry.get("day", "").capitalize()
+                if not entry.get("host") or day not in DAYS:
+                    counts["skipped"] += 1
+                    continue
+                try:
+                    event_date = datetime.date.fromisoformat(entry["date"]) if entry.get("date") else event_date_for_day(day, reference_date)
+                except ValueError:
+                    counts["skipped"] += 1
+                    continue
+                description = entry.get("description", "")
+                event_id = self._insert(entry["event_type"], entry.get("squad", ""), entry["host"], day,
+                                        "" if description == "N/A" else description, entry["attendees"], event_date, "import")
+                counts["duplicates" if event_id is None else "imported"] += 1
+        return counts
+
+    def member_counts(self, start, end, squad=None, event_type=None):
+        query = ("SELECT a.username, COUNT(*) FROM events e JOIN attendance a ON a.event_id = e.id"
+                 " WHERE e.event_date BETWEEN ? AND ?")
+        params = [start.isoformat(), end.isoformat()]
+        if squad:
+            query += " AND e.squad = ?"
+            params.append(squad)
+        if event_type:
+            query += " AND e.event_type = ?"
+            params.append(event_type)
+        query += " GROUP BY a.username ORDER BY COUNT(*) DESC, a.username"
+        return self.db.execute(query, params).fetchall()
+
+    def member_summary(self, username, start, end):
+        params = (username, start.isoformat(), end.isoformat())
+        by_type = self.db.execute(
+            "SELECT e.event_type, COUNT(*) FROM attendance a JOIN events e ON e.id = a.event_id"
+            " WHERE a.username = ? AND e.event_date BETWEEN ? AND ? GROUP BY e.event_type ORDER BY COUNT(*) DESC",
+            params).fetchall()
+        hosted = self.db.execute("SELECT COUNT(*) FROM events WHERE host = ? AND event_date BETWEEN ? AND ?", params).fetchone()[0]
+        return {"username": username, "attended": sum(count for _, count in by_type), "hosted": hosted,
+                "by_event_type": dict(by_type)}
+
+    def squad_totals(self, start, end):
+        return self.db.execute(
+            "SELECT squad, COUNT(*), SUM(attendee_count) FROM events WHERE event_date BETWEEN ? AND ?"
+            " GROUP BY squad ORDER BY squad", (start.isoformat(), end.isoformat())).fetchall()
+
+def format_history_report(store, view, start, end, member=None):
+    if view == "member":
+        summary = store.member_summary(member, start, end)
+        lines = [f"{summary['username']}: attended {summary['attended']}, hosted {summary['hosted']}"]
+        lines.extend(f"  {event_type}: {count}" for event_type, count in summary["by_event_type"].items())
+    elif view == "squads":
+        lines = [f"{squad or '-'}: {events} events, {attendance or 0} attendances" for squad, events, attendance in store.squad_totals(start, end)]
+    else:
+        lines = [f"{username}: {count}" for username, count in store.member_counts(start, end)]
+    return f"{start.isoformat()} to {end.isoformat()}\n" + ("\n".join(lines) or "No events recorded.")
+
+_batch_reader = None
+_batch_settings = None
+_batch_cache = None
+
+def _init_batch_worker(torch_threads, settings, roster_path):
+    global _batch_reader, _batch_settings, _batch_cache
+    if settings["ocr_threads"] <= 0:
+        settings = dict(settings, ocr_threads=torch_threads)
+    lexicon = load_roster(roster_path) if roster_path and settings["ocr_decoder"] == "wordbeamsearch" else None
+    _batch_reader = create_ocr_reader(settings, lexicon)
+    _batch_settings = settings
+    _batch_cache = OcrCache.from_settings(settings)
+
+def _batch_extract(image_path):
+    try:
+        if image_path.lower().endswith(VIDEO_EXTENSIONS):
+            usernames, stats = extract_usernames_from_video(_batch_reader, image_path, _batch_settings, _batch_cache)
+            return usernames, "", stats
+        image_data = np.array(Image.open(image_path).convert("RGB"))
+        usernames, stats = extract_usernames(_batch_reader, image_data, _batch_settings, _batch_cache)
+        return usernames, "", stats
+    except Exception as e:
+        return [], str(e), {}
+
+def _tile_ready(_):
+    return _batch_reader is not None
+
+def _tile_recognize(strip):
+    results = run_readtext(_batch_reader, strip, PipelineTrace("tile"), _batch_settings)
+    return [([[float(x), float(y)] for x, y in box], text, float(confidence)) for box, text, confidence in results]
+
+class StripTiler:
+    # Pool of OCR worker processes, each with its own reader, that recognizes the strips
+    # of a tall list at the same time. Workers are spawned rather than forked because the
+    # GUI process already runs threads.
+    def __init__(self, workers, settings, roster_path=None):
+        self.workers = workers
+        self.min_rows = settings["tile_min_rows"]
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_batch_worker, initargs=(torch_threads, settings, roster_path))
+
+    def warm_up(self):
+        for index in range(self.workers):
+            self.pool.submit(_tile_ready, index)
+
+    def recognize(self, image_data, trace, cancel_event=None):
+        with trace.stage("tile"):
+            strips = split_into_strips(image_data, self.workers, self.min_rows)
+        if not strips:
+            return None
+        with trace.stage("recognize"):
+            futures = [self.pool.submit(_tile_recognize, strip) for strip, _, _, _ in strips]
+            outputs = [future.result() for future in futures]
+        check_cancelled(cancel_event)
+        results = []
+        for (_, offset, top, bottom), strip_results in zip(strips, outputs):
+            for box, text, confidence in strip_results:
+                box = [[x, y + offset] for x, y in box]
+                centre = (min(y for _, y in box) + max(y for _, y in box)) / 2
+                if top <= centre < bottom:
+                    results.append((box, text, confidence))
+        return results, len(strips)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def load_batch_jobs(source, defaults):
+    if os.path.isdir(source):
+        images = sorted(os.path.join(source, name) for name in os.listdir(source)
+                        if name.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS))
+        return [dict(defaults, images=[image]) for image in images]
+    with open(source, 'r') as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(source))
+    jobs = []
+    for number, entry in enumerate(manifest, 1):
+        # A bad entry becomes a job that only reports its errors, so the rest of the batch still runs.
+        job = dict(defaults, images=[], errors=[])
+        jobs.append(job)
+        if not isinstance(entry, dict):
+            job["errors"].append(f"- Manifest entry {number} is not a JSON object.")
+            continue
+        images = entry.get("images", entry.get("image", []))
+        if isinstance(images, str):
+            images = [images]
+        if not isinstance(images, list) or not all(isinstance(image, str) and image for image in images):
+            job["errors"].append(f"- Manifest entry {number} has an invalid image list.")
+            images = []
+        elif not images:
+            job["errors"].append(f"- Manifest entry {number} lists no images.")
+        for field in ("event", "squad", "host", "day", "description"):
+            if field in entry and not isinstance(entry[field], str):
+                job["errors"].append(f"- Manifest entry {number} has an invalid '{field}'.")
+                entry = {key: value for key, value in entry.items() if key != field}
+        job.update({key: value for key, value in entry.items() if key not in ("image", "images", "errors")})
+        job["images"] = [os.path.join(base_dir, image) for image in images]
+    return jobs
+
+def run_batch(jobs, roster, workers, settings):
+    image_paths = list(dict.fromkeys(image for job in jobs for image in job["images"]))
+    workers = max(1, min(workers, len(image_paths)))
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(torch_threads, settings, roster.source_path)) as pool:
+        extracted = dict(zip(image_paths, pool.map(_batch_extract, image_paths)))
+
+    results = []
+    for job in jobs:
+        attendees, errors, image_stats = [], list(job.get("errors", [])), []
+        for image in job["images"]:
+            usernames, error_message, stats = extracted[image]
+            if error_message:
+                errors.append(f"- Could not read '{image}': {error_message}")
+            attendees.extend(usernames)
+            image_stats.append(stats)
+        attendees = list(dict.fromkeys(attendees))
+        host = (job.get("host") or "").strip()
+        taken = os.path.getmtime(job["images"][0]) if job["images"] and os.path.exists(job["images"][0]) else time.time()
+        day = job.get("day") or DAYS[datetime.datetime.fromtimestamp(taken).weekday()]
+        suggestions = find_suggestions(roster, attendees)
+        errors.extend(validate_log_fields(job["event"], host, attendees))
+        results.append({
+            "images": job["images"],
+            "attendees": attendees,
+            "suggestions": suggestions,
+            "errors": errors,
+            "log": format_log_entry(job["event"], job["squad"], host, day, job.get("description", ""), attendees),
+            "stats": image_stats,
+        })
+    return results
+
+def find_suggestions(roster, names):
+    suggestions = []
+    if roster:
+        for name in names:
+            if name not in roster:
+                potential_matches = roster.get_close_matches(name, n=1, cutoff=SIMILARITY_THRESHOLD)
+                if potential_matches:
+                    suggestions.append({"name": name, "suggestion": potential_matches[0][0],
+                                        "score": round(potential_matches[0][1], 3)})
+    return suggestions
+
+def format_batch_results(results, output_format):
+    if output_format == "json":
+        return json.dumps(results, indent=2)
+    blocks = []
+    for result in results:
+        notes = [f"# {', '.join(os.path.basename(image) for image in result['images'])}"]
+        notes.extend(f"# {line}" for error in result["errors"] for line in error.splitlines())
+        notes.extend(f"# suggestion: {item['name']} -> {item['suggestion']}" for item in result["suggestions"])
+        blocks.append("\n".join(notes) + "\n" + result["log"])
+    return "\n\n".join(blocks)
+
+MAX_REQUEST_BYTES = 64 * 2**20
+
+class BatchingExtractor:
+    # HTTP handler threads hand their images to one worker thread, which waits up to the
+    # batch window for more requests and then extracts them together with the shared reader.
+    def __init__(self, reader, settings, cache=None):
+        self.reader = reader
+        self.settings = settings
+        self.cache = cache
+        self.requests = queue.Queue()
+        self.batch_sizes = Counter()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def extract(self, image_data):
+        request = {"image": image_data, "submitted": time.perf_counter(), "done": threading.Event()}
+        self.requests.put(request)
+        request["done"].wait()
+        if "error" in request:
+            raise RuntimeError(request["error"])
+        return request["result"]
+
+    def _run(self):
+        window = self.settings["serve_batch_window_ms"] / 1000
+        while True:
+            batch = [self.requests.get()]
+            deadline = time.perf_counter() + window
+            while len(batch) < self.settings["serve_max_batch"]:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.batch_sizes[len(batch)] += 1
+            started = time.perf_counter()
+            traces = [PipelineTrace("serve") for _ in batch]
+            try:
+                outputs = extract_usernames_batch(self.reader, [request["image"] for request in batch], self.settings,
+                                                  self.cache, traces=traces)
+            except Exception as e:
+                for request in batch:
+                    request["error"] = str(e)
+                    request["done"].set()
+                continue
+            for request, (usernames, stats) in zip(batch, outputs):
+                stats.update(batch_size=len(batch), queue_ms=round((started - request["submitted"]) * 1000, 1))
+                request["result"] = (usernames, stats)
+                request["done"].set()
+
+class ExtractionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, extractor, roster_path, roster):
+        super().__init__(address, ExtractionRequestHandler)
+        self.extractor = extractor
+        self.roster_path = roster_path
+        self.roster = roster
+        self.roster_lock = threading.Lock()
+        self.started = time.time()
+
+    def current_roster(self):
+        with self.roster_lock:
+            try:
+                st = os.stat(self.roster_path)
+            except OSError:
+                return self.roster
+            if (st.st_mtime_ns, st.st_size) != self.roster.source_stat:
+                self.roster = load_roster(self.roster_path)
+                set_ocr_lexicon(self.extractor.reader, self.roster)
+            return self.roster
+
+    def status(self):
+        return {"ready": True, "backend": self.extractor.settings["ocr_backend"], "queued": self.extractor.requests.qsize(),
+                "batch_sizes": dict(self.extractor.batch_sizes), "uptime_s": round(time.time() - self.started),
+                "roster_size": len(self.roster)}
+
+    def build_log(self, request):
+        if not isinstance(request, dict):
+            raise ValueError("expected a JSON object")
+        for field in ("event", "squad", "host", "day", "description"):
+            if not isinstance(request.get(field, ""), (str, type(None))):
+                raise ValueError(f"'{field}' must be a string")
+        if not isinstance(request.get("attendees", []), list) or not all(isinstance(name, str) for name in request.get("attendees", [])):
+            raise ValueError("'attendees' must be a list of names")
+        event_type = request.get("event") or EVENT_TYPES[0]
+        host = (request.get("host") or "").strip()
+        day = request.get("day") or DAYS[datetime.date.today().weekday()]
+        attendees = list(dict.fromkeys(request.get("attendees", [])))
+        return {"log": format_log_entry(event_type, request.get("squad") or SQUADS[0], host, day,
+                                        request.get("description") or "", attendees),
+                "errors": validate_log_fields(event_type, host, attendees),
+                "suggestions": find_suggestions(self.current_roster(), attendees)}
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    # GET /health, POST /extract with an image file as the body, POST /log with the
+    # log fields as JSON. Every response is JSON.
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, self.server.status())
+        else:
+            self.send_json(404, {"error": "Not found."})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError("negative Content-Length")
+            if length > MAX_REQUEST_BYTES:
+                self.send_json(413, {"error": "Request too large."})
+                return
+            body = self.rfile.read(length)
+            if self.path == "/extract":
+                image_data = np.array(Image.open(io.BytesIO(body)).convert("RGB"))
+                usernames, stats = self.server.extractor.extract(image_data)
+                self.send_json(200, {"usernames": usernames, "stats": stats})
+            elif self.path == "/log":
+                self.send_json(200, self.server.build_log(json.loads(body)))
+            else:
+                self.send_json(404, {"error": "Not found."})
+        except (ValueError, KeyError, OSError, Image.DecompressionBombError) as e:
+            self.send_json(400, {"error": f"Bad request: {e}"})
+        except RuntimeError as e:
+            self.send_json(500, {"error": str(e)})
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def run_server(address, settings):
+    host, _, port = address.rpartition(':')
+    roster_path = default_roster_path()
+    roster = load_roster(roster_path) if os.path.exists(roster_path) else UsernameMatcher([])
+    reader = create_ocr_reader(settings, roster)
+    extractor = BatchingExtractor(reader, settings, OcrCache.from_settings(settings))
+    server = ExtractionServer((host or '127.0.0.1', int(port)), extractor, roster_path, roster)
+    print(f"Serving extraction on http://{server.server_address[0]}:{server.server_address[1]} "
+          f"(batch window {settings['serve_batch_window_ms']} ms, up to {settings['serve_max_batch']} images).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+class RemoteExtractor:
+    # Stands in for the local reader when the GUI uses an extraction server (the ocr_server setting).
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        if "://" not in self.url:
+            self.url = "http://" + self.url
+
+    def request(self, path, body=None, content_type=None, timeout=120):
+        request = urllib.request.Request(self.url + path, data=body, headers={"Content-Type": content_type} if content_type else {})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise RuntimeError(f"OCR server: {message}") from None
+
+    def health(self):
+        return self.request("/health", timeout=5)
+
+    def extract(self, image_data, trace=None):
+        trace = trace or PipelineTrace("remote")
+        with trace.stage("encode"):
+            buffer = io.BytesIO()
+            Image.fromarray(np.ascontiguousarray(image_data)).save(buffer, format="PNG", compress_level=1)
+        with trace.stage("remote"):
+            response = self.request("/extract", buffer.getvalue(), "image/png")
+        return response["usernames"], dict(response["stats"], server=self.url)
+
 class ImageDropArea(QLabel):
     image_received = pyqtSignal(QImage)
+    video_received = pyqtSignal(str)
+    cancel_requested = pyqtSignal()
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.busy = False
         self.setAcceptDrops(True)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setText("Drop VC Attendee list Screenshot Here\nor Paste from Clipboard (Ctrl+V or Right-Click)")
@@ -60,7 +1911,11 @@ class ImageDropArea(QLabel):
     
     def dropEvent(self, event):
         if event.mimeData().hasUrls():
-            image = QImage(event.mimeData().urls()[0].toLocalFile())
+            path = event.mimeData().urls()[0].toLocalFile()
+            if path.lower().endswith(VIDEO_EXTENSIONS):
+                self.video_received.emit(path)
+                return
+            image = QImage(path)
             if not image.isNull(): self.image_received.emit(image)
     
     def paste_image(self):
@@ -74,6 +1929,10 @@ class ImageDropArea(QLabel):
         paste_action.setEnabled(QApplication.clipboard().mimeData().hasImage())
         paste_action.triggered.connect(self.paste_image)
         menu.addAction(paste_action)
+        cancel_action = QAction("Cancel Extraction", self)
+        cancel_action.setEnabled(self.busy)
+        cancel_action.triggered.connect(self.cancel_requested.emit)
+        menu.addAction(cancel_action)
         menu.exec(event.globalPos())
 
 class SuggestionDialog(QDialog):
@@ -120,7 +1979,10 @@ class HelpDialog(QDialog):
         help_text = """
         <b>Step 1: Get the Image</b><br>
         - Drag & drop a screenshot file into the drop area.<br>
-        - OR, use a snipping tool (Win+Shift+S), then Ctrl+V or right-click to paste.
+        - A screen recording or animated GIF of the voice channel also works; everyone who appears in it is listed.<br>
+        - OR, use a snipping tool (Win+Shift+S), then Ctrl+V or right-click to paste.<br>
+        - Pasting a new image while one is waiting replaces it. Press Esc to cancel an extraction.<br>
+        - For lists too long for one screenshot, tick "Append screenshots" and paste each part in turn.
         <p><b>Step 2: Correct the Names</b><br>
         - The screenshot attendee extraction will appear in the "Attendees" text box.<br>
         - Manually review and correct any mistakes (e.g., 'O' vs '0', 'S' vs '5').
@@ -140,18 +2002,85 @@ class HelpDialog(QDialog):
         label.setWordWrap(True)
         layout.addWidget(label)
 
+class HistoryDialog(QDialog):
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.setWindowTitle("Attendance History")
+        self.setMinimumSize(450, 500)
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        start, end = current_week()
+        self.start_input = QDateEdit(QDate(start.year, start.month, start.day))
+        self.end_input = QDateEdit(QDate(end.year, end.month, end.day))
+        self.view_input = QComboBox()
+        self.view_input.addItems(["Members", "Squads"])
+        self.member_input = QLineEdit()
+        self.member_input.setPlaceholderText("Username (optional)")
+        for widget in (self.start_input, self.end_input):
+            widget.setCalendarPopup(True)
+            widget.dateChanged.connect(self.refresh)
+        self.view_input.currentIndexChanged.connect(self.refresh)
+        self.member_input.textChanged.connect(self.refresh)
+        for widget in (self.start_input, QLabel("to"), self.end_input, self.view_input):
+            controls.addWidget(widget)
+        layout.addLayout(controls)
+        layout.addWidget(self.member_input)
+        self.results = QTextEdit()
+        self.results.setReadOnly(True)
+        layout.addWidget(self.results)
+        import_button = QPushButton("Import Logs...")
+        import_button.clicked.connect(self.import_logs)
+        layout.addWidget(import_button)
+        self.refresh()
+
+    def refresh(self, *args):
+        member = self.member_input.text().strip()
+        view = "member" if member else self.view_input.currentText().lower()
+        self.results.setPlainText(format_history_report(self.store, view, self.start_input.date().toPyDate(),
+                                                        self.end_input.date().toPyDate(), member))
+
+    def import_logs(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Import Logs", "", "Text files (*.txt);;All files (*)")
+        totals = Counter()
+        for path in paths:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                totals.update(self.store.import_logs(f.read(), datetime.date.fromtimestamp(os.path.getmtime(path))))
+        if paths:
+            QMessageBox.information(self, "Import Logs", f"Imported {totals['imported']} logs "
+                                    f"({totals['duplicates']} already recorded, {totals['skipped']} incomplete).")
+            self.refresh()
+
 class MainWindow(QMainWindow):
     ocr_ready_signal = pyqtSignal()
-    ocr_complete_signal = pyqtSignal(list, str) 
+    ocr_status_signal = pyqtSignal(str)
+    ocr_complete_signal = pyqtSignal(list, str, dict)
+    roster_loaded_signal = pyqtSignal(object, str, str)
 
-    def __init__(self):
+    def __init__(self, startup_report_path=None):
         super().__init__()
+        self.startup_report_path = startup_report_path
+        self.startup_timings = {"window_created_s": time.perf_counter() - STARTUP_T0}
         self.setWindowTitle("Themis; SELA")
         self.setGeometry(100, 100, 1000, 750)
         icon_path = resource_path('Themis.ico')
         self.setWindowIcon(QIcon(icon_path))
         self.ocr_reader = None
+        self.tiler = None
         self.is_ocr_ready = False
+        self.ocr_unloaded = False
+        self.ocr_lock = threading.Lock()
+        self.last_ocr_use = time.monotonic()
+        self.memory_report = {}
+        self.settings = load_settings()
+        self.ocr_cache = OcrCache.from_settings(self.settings)
+        self.history = None
+        self.recorded_event_id = None
+        if self.settings["record_history"]:
+            try:
+                self.history = AttendanceStore.from_settings(self.settings)
+            except (sqlite3.Error, OSError) as e:
+                print(f"WARNING: Could not open attendance history ({e}).")
         font_path = resource_path('IBMPlexSans-Medium.ttf')
         font_id = QFontDatabase.addApplicationFont(font_path)
         if font_id != -1:
@@ -161,33 +2090,91 @@ class MainWindow(QMainWindow):
             self.app_font_family = "Arial" 
         self.setup_ui()
         self.load_master_usernames()
+        self.watch_master_usernames()
         self.host_input.setFocus()
         self.ocr_ready_signal.connect(self.on_ocr_ready)
         self.ocr_complete_signal.connect(self.on_ocr_complete)
+        self.ocr_status_signal.connect(self.status_label.setText)
+        self.ocr_jobs = OcrJobQueue(self._process_job, lambda job, result: self.ocr_complete_signal.emit(*result))
+        self.latest_job_id = 0
+        self.trace_log = deque(maxlen=500)
+        self.append_row_signatures = set()
+        self.append_reset_pending = False
         self.status_label.setText("Initializing EasyOCR... This may take a moment.")
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setInterval(30000)
+        self.idle_timer.timeout.connect(self.check_idle)
+        self.idle_timer.start()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if "first_paint_s" not in self.startup_timings:
+            self.startup_timings["first_paint_s"] = time.perf_counter() - STARTUP_T0
+            QTimer.singleShot(0, self.start_ocr_initialization)
+
+    def start_ocr_initialization(self):
         threading.Thread(target=self.initialize_ocr, daemon=True).start()
 
     def load_master_usernames(self):
-        self.master_usernames = set()
-        
+        self.master_usernames, message = self.read_master_usernames()
+        self.roster_path = default_roster_path()
+        self.status_label.setText(message)
+
+    def read_master_usernames(self):
         external_path = 'usernames.txt' 
         internal_path = resource_path('usernames.txt')
 
         try:
-            with open(external_path, 'r') as f:
-                self.master_usernames = {line.strip() for line in f if line.strip()}
-            self.status_label.setText(f"Loaded {len(self.master_usernames)} usernames from external file.")
-            return 
-        
+            matcher = load_roster(external_path)
+            return matcher, f"Loaded {len(matcher)} usernames from external file."
         except FileNotFoundError:
             pass
         try:
-            with open(internal_path, 'r') as f:
-                self.master_usernames = {line.strip() for line in f if line.strip()}
-            self.status_label.setText(f"Using default username list. Create a usernames.txt to override.")
-
+            return load_roster(internal_path), "Using default username list. Create a usernames.txt to override."
         except FileNotFoundError:
-            self.status_label.setText("No username list found. Suggestion feature disabled.")
+            return UsernameMatcher([]), "No username list found. Suggestion feature disabled."
+
+    def watch_master_usernames(self):
+        # Editors often save by replacing the file, which drops a file watch, so the
+        # folder is watched as well and the file re-added after every change.
+        self.roster_watcher = QFileSystemWatcher(self)
+        self.roster_watcher.addPath(os.path.abspath('.'))
+        self.roster_watcher.fileChanged.connect(self.schedule_roster_reload)
+        self.roster_watcher.directoryChanged.connect(self.schedule_roster_reload)
+        self.roster_reload_timer = QTimer(self)
+        self.roster_reload_timer.setSingleShot(True)
+        self.roster_reload_timer.setInterval(500)
+        self.roster_reload_timer.timeout.connect(self.start_roster_reload)
+        self.roster_loaded_signal.connect(self.on_roster_loaded)
+        self.schedule_roster_reload()
+
+    def schedule_roster_reload(self, *args):
+        self.roster_reload_timer.start()
+
+    def start_roster_reload(self):
+        external_path = os.path.abspath('usernames.txt')
+        if os.path.exists(external_path) and external_path not in self.roster_watcher.files():
+            self.roster_watcher.addPath(external_path)
+        path = default_roster_path()
+        try:
+            st = os.stat(path)
+            current = (path, (st.st_mtime_ns, st.st_size))
+        except OSError:
+            current = (path, None)
+        if current == (self.roster_path, self.master_usernames.source_stat):
+            return
+        def reload():
+            matcher, message = self.read_master_usernames()
+            self.roster_loaded_signal.emit(matcher, path, message)
+        threading.Thread(target=reload, daemon=True).start()
+
+    def on_roster_loaded(self, matcher, path, message):
+        self.master_usernames = matcher
+        reader = self.ocr_reader
+        if reader is not None and not isinstance(reader, RemoteExtractor):
+            set_ocr_lexicon(reader, matcher)
+        self.roster_path = path
+        self.status_label.setText(f"Username list changed. {message}")
 
     def setup_ui(self):
         central_widget = QWidget()
@@ -202,13 +2189,13 @@ class MainWindow(QMainWindow):
         
         form_layout.addWidget(QLabel("Event:"))
         self.event_input = QComboBox()
-        self.event_input.addItems(["Combat Training", "Crate Run", "Rally", "Raid", "Patrol", "Fort Event", "Miscellaneous Event", "Mandatory Event", "Practise Raid"])
+        self.event_input.addItems(EVENT_TYPES)
         self.event_input.view().setAlternatingRowColors(True) 
         form_layout.addWidget(self.event_input)
         
         form_layout.addWidget(QLabel("Squad:"))
         self.squad_input = QComboBox()
-        self.squad_input.addItems(["1P", "1A", "1B", "1C","2P", "2A", "2B", "2C", "3P", "3A", "3B", "3C", "HQ"])
+        self.squad_input.addItems(SQUADS)
         self.squad_input.view().setAlternatingRowColors(True) 
         form_layout.addWidget(self.squad_input)
         
@@ -218,7 +2205,7 @@ class MainWindow(QMainWindow):
         
         form_layout.addWidget(QLabel("Day:"))
         self.day_input = QComboBox()
-        self.day_input.addItems(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"])
+        self.day_input.addItems(DAYS)
         self.day_input.setCurrentIndex(datetime.datetime.today().weekday())
         self.day_input.view().setAlternatingRowColors(True) 
         form_layout.addWidget(self.day_input)
@@ -233,12 +2220,27 @@ class MainWindow(QMainWindow):
         ocr_layout.setSpacing(10) 
         self.drop_area = ImageDropArea()
         self.drop_area.image_received.connect(self.run_ocr_on_image)
+        self.drop_area.video_received.connect(self.run_ocr_on_video)
+        self.drop_area.cancel_requested.connect(self.cancel_ocr)
         paste_action = QAction("Paste Image", self)
         paste_action.setShortcut(QKeySequence.StandardKey.Paste)
         paste_action.triggered.connect(self.drop_area.paste_image)
         self.addAction(paste_action)
+        cancel_action = QAction("Cancel Extraction", self)
+        cancel_action.setShortcut(QKeySequence(Qt.Key.Key_Escape))
+        cancel_action.triggered.connect(self.cancel_ocr)
+        self.addAction(cancel_action)
         ocr_layout.addWidget(self.drop_area, 2)
-        ocr_layout.addWidget(QLabel("Attendees:"))
+        attendee_header = QHBoxLayout()
+        attendee_header.addWidget(QLabel("Attendees:"))
+        attendee_header.addStretch()
+        self.append_checkbox = QCheckBox("Append screenshots")
+        self.append_checkbox.setToolTip("Add names from each new screenshot to the list instead of replacing it.\n"
+                                        "Rows already read from earlier screenshots are skipped.\n"
+                                        "Untick and tick again to start a new list.")
+        self.append_checkbox.toggled.connect(self.reset_append_session)
+        attendee_header.addWidget(self.append_checkbox)
+        ocr_layout.addLayout(attendee_header)
         self.attendee_box = QTextEdit()
         self.attendee_box.setPlaceholderText("Extraction results will appear here...")
         ocr_layout.addWidget(self.attendee_box, 3)
@@ -273,87 +2275,288 @@ class MainWindow(QMainWindow):
 
     def initialize_ocr(self):
         try:
-            self.ocr_reader = easyocr.Reader(['en'])
+            start = time.perf_counter()
+            if self.settings["ocr_server"]:
+                self.ocr_reader = self.connect_ocr_server()
+            if self.ocr_reader is not None:
+                self.startup_timings["model_load_s"] = time.perf_counter() - start
+                self.startup_timings["model_source"] = f"server at {self.ocr_reader.url}"
+            else:
+                import easyocr
+                loaded = time.perf_counter()
+                self.ocr_reader = create_ocr_reader(self.settings, self.master_usernames)
+                self.startup_timings["ocr_import_s"] = loaded - start
+                self.startup_timings["model_load_s"] = time.perf_counter() - loaded
+                self.startup_timings["model_source"] = "warm start cache" if self.ocr_reader.warm_start else "model files"
+                if getattr(self.ocr_reader, 'fallback_reason', None):
+                    self.startup_timings["backend_fallback"] = self.ocr_reader.fallback_reason
+                self.start_tiler()
+            self.startup_timings["ocr_ready_s"] = time.perf_counter() - STARTUP_T0
             self.is_ocr_ready = True
             self.ocr_ready_signal.emit()
         except Exception as e:
             self.is_ocr_ready = False
-            self.ocr_complete_signal.emit([], f"Failed to initialize EasyOCR: {e}")
+            self.ocr_complete_signal.emit([], f"Failed to initialize EasyOCR: {e}", {})
+
+    def start_tiler(self):
+        if self.settings["tile_workers"] > 1:
+            self.tiler = StripTiler(self.settings["tile_workers"], self.settings, self.master_usernames.source_path)
+            self.tiler.warm_up()
+
+    def connect_ocr_server(self):
+        remote = RemoteExtractor(self.settings["ocr_server"])
+        try:
+            remote.health()
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"WARNING: OCR server {remote.url} is not reachable ({e}). Loading the OCR model locally.")
+            return None
+        return remote
 
     def on_ocr_ready(self):
-        self.status_label.setText("Ready. Drop or paste an image.")
+        fallback = f" Note: {self.startup_timings['backend_fallback']}." if "backend_fallback" in self.startup_timings else ""
+        self.status_label.setText(f"Ready in {self.startup_timings['ocr_ready_s']:.1f}s "
+                                  f"(model loaded from {self.startup_timings['model_source']} in {self.startup_timings['model_load_s']:.1f}s). "
+                                  f"Drop or paste an image.{fallback}")
+        if self.startup_report_path:
+            write_startup_report(self.get_startup_report(), self.startup_report_path)
+            QApplication.quit()
 
-    def on_ocr_complete(self, usernames, error_message):
+    def check_idle(self):
+        limit = self.settings["idle_unload_minutes"]
+        if limit <= 0 or self.ocr_reader is None or not self.is_ocr_ready or isinstance(self.ocr_reader, RemoteExtractor):
+            return
+        if time.monotonic() - self.last_ocr_use < limit * 60:
+            return
+        if not self.ocr_lock.acquire(blocking=False):
+            return
+        try:
+            before = resident_memory_mb()
+            self.ocr_reader = None
+            if self.tiler:
+                self.tiler.shutdown()
+                self.tiler = None
+            self.is_ocr_ready = False
+            self.ocr_unloaded = True
+            release_ocr_memory()
+            after = resident_memory_mb()
+        finally:
+            self.ocr_lock.release()
+        self.memory_report = {"loaded_mb": round(before, 1), "unloaded_mb": round(after, 1)}
+        self.status_label.setText(f"OCR model unloaded after {limit} min idle ({before:.0f} MB → {after:.0f} MB). "
+                                  "It will reload on the next image.")
+
+    def reload_ocr(self):
+        self.ocr_status_signal.emit("Reloading OCR model... This may take a moment.")
+        start = time.perf_counter()
+        self.ocr_reader = create_ocr_reader(self.settings, self.master_usernames)
+        self.start_tiler()
+        self.is_ocr_ready = True
+        self.ocr_unloaded = False
+        self.memory_report.update(reload_s=round(time.perf_counter() - start, 2), reloaded_mb=round(resident_memory_mb(), 1))
+        self.ocr_status_signal.emit(f"OCR model reloaded in {self.memory_report['reload_s']:.1f}s. Processing image...")
+
+    def get_startup_report(self):
+        report = {name: round(value, 3) if isinstance(value, float) else value for name, value in self.startup_timings.items()}
+        report["frozen"] = getattr(sys, 'frozen', False)
+        return report
+
+    def on_ocr_complete(self, usernames, error_message, stats):
+        self.drop_area.busy = self.ocr_jobs.depth() > 0
+        if "trace" in stats:
+            self.trace_log.append(stats["trace"])
+        if stats.get("append"):
+            if error_message:
+                # Keep every name collected so far (and any hand edits); only report the failed shot.
+                self.status_label.setText(f"Could not read the screenshot (job #{stats['job_id']}): {error_message}. "
+                                          "The names collected so far are unchanged.")
+            else:
+                self.merge_appended_usernames(usernames, stats)
+            return
+        if stats.get("job_id", self.latest_job_id) < self.latest_job_id:
+            return
         self.attendee_box.clear()
+        if stats.get("cancelled"):
+            self.attendee_box.setPlaceholderText("Extraction cancelled. Drop or paste an image to try again.")
+            self.status_label.setText(f"Extraction cancelled (job #{stats['job_id']}).")
+            return
         if error_message:
             QMessageBox.critical(self, "OCR Error", error_message)
             self.attendee_box.setPlaceholderText("OCR failed. Please try again or enter names manually.")
             self.status_label.setText("OCR failed.")
         elif usernames:
             self.attendee_box.setPlainText("\n".join(usernames))
-            self.status_label.setText(f"Successfully extracted {len(usernames)} names.")
+            if stats.get("video"):
+                details = f"{stats['ocr_passes']} OCR passes over {stats['frames']} sampled frames"
+            elif stats.get("cache") == "hit":
+                details = f"cached, {stats['cache_ms']:.0f} ms"
+            else:
+                layout = {"rows": "row layout", "tiles": f"{stats.get('tiles')} parallel strips"}.get(stats["layout"], "full detection")
+                details = f"{describe_preprocess(stats)}, OCR {stats['ocr_ms']:.0f} ms using {layout}"
+            if self.settings["show_stage_timings"]:
+                details = describe_stages(stats["stages"])
+            unsure = [row["username"] for row in stats.get("rows", []) if row["confidence"] < LOW_CONFIDENCE or row["source"] != "bracket"]
+            if unsure:
+                details += f"; please check {', '.join(unsure[:5])}{', ...' if len(unsure) > 5 else ''}"
+            self.status_label.setText(f"Successfully extracted {len(usernames)} names. "
+                                      f"(job #{stats['job_id']} in {stats['latency_ms'] / 1000:.1f}s; {details})")
         else:
             self.attendee_box.setPlaceholderText("No usernames found. You can enter them manually.")
-            self.status_label.setText("No usernames found in the image.")
+            timings = f" ({describe_stages(stats['stages'])})" if self.settings["show_stage_timings"] and stats.get("stages") else ""
+            self.status_label.setText(f"No usernames found in the image.{timings}")
+
+    def merge_appended_usernames(self, usernames, stats):
+        if stats.get("cancelled"):
+            self.status_label.setText(f"Extraction cancelled (job #{stats['job_id']}).")
+            return
+        existing = [line.strip() for line in self.attendee_box.toPlainText().split('\n') if line.strip()]
+        merged = list(dict.fromkeys(existing + usernames))
+        self.attendee_box.setPlainText("\n".join(merged))
+        overlap = f"; skipped {stats['overlap_rows']} rows seen before" if stats['overlap_rows'] else ""
+        if self.settings["show_stage_timings"]:
+            overlap += f"; {describe_stages(stats['stages'])}"
+        self.status_label.setText(f"Added {len(merged) - len(existing)} new names, {len(merged)} in total. "
+                                  f"(job #{stats['job_id']} in {stats['latency_ms'] / 1000:.1f}s{overlap})")
+
+    def reset_append_session(self):
+        self.append_reset_pending = True
 
     def run_ocr_on_image(self, q_image):
-        if not self.is_ocr_ready:
+        if not self.is_ocr_ready and not self.ocr_unloaded:
             QMessageBox.warning(self, "OCR Not Ready", "The OCR engine is still initializing. Please wait.")
             return
         self.drop_area.setPixmap(QPixmap.fromImage(q_image).scaled(
             self.drop_area.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-        self.attendee_box.setText("Processing OCR...")
-        self.status_label.setText("Processing image...")
-        QApplication.processEvents()
-        buffer = QBuffer()
-        buffer.open(QIODeviceBase.OpenModeFlag.ReadWrite)
-        q_image.save(buffer, "PNG")
-        pil_image = Image.open(io.BytesIO(buffer.data())).convert("RGB")
-        numpy_image = np.array(pil_image)
-        threading.Thread(target=self._process_in_thread, args=(numpy_image,), daemon=True).start()
-
-    def _process_in_thread(self, image_data):
+        append = self.append_checkbox.isChecked()
+        if not append:
+            self.attendee_box.setText("Processing OCR...")
+            self.recorded_event_id = None
+        payload = {"image": QImage(q_image), "append": append, "reset": self.append_reset_pending}
+        self.append_reset_pending = False
+        self.latest_job_id = self.ocr_jobs.submit(payload, coalesce=not append)
+        self.drop_area.busy = True
+        self.status_label.setText(f"Queued image (job #{self.latest_job_id}, {self.ocr_jobs.depth()} in queue)...")
+
+    def run_ocr_on_video(self, path):
+        if not self.is_ocr_ready and not self.ocr_unloaded:
+            QMessageBox.warning(self, "OCR Not Ready", "The OCR engine is still initializing. Please wait.")
+            return
+        self.drop_area.setText(f"Video: {os.path.basename(path)}")
+        append = self.append_checkbox.isChecked()
+        if not append:
+            self.attendee_box.setText("Processing OCR...")
+            self.recorded_event_id = None
+        payload = {"video": path, "append": append, "reset": self.append_reset_pending}
+        self.append_reset_pending = False
+        self.latest_job_id = self.ocr_jobs.submit(payload, coalesce=not append)
+        self.drop_area.busy = True
+        self.status_label.setText(f"Queued video (job #{self.latest_job_id}, {self.ocr_jobs.depth()} in queue)...")
+
+    def cancel_ocr(self):
+        if self.ocr_jobs.cancel_all():
+            self.status_label.setText("Cancelling extraction...")
+            self.drop_area.busy = self.ocr_jobs.depth() > 0
+
+    def _process_job(self, job):
+        started = time.perf_counter()
+        self.ocr_status_signal.emit(f"Processing image (job #{job['id']}, {self.ocr_jobs.depth() - 1} waiting)...")
+        trace = PipelineTrace(f"job #{job['id']}")
         try:
-            results = self.ocr_reader.readtext(image_data)
-            full_text = ' '.join([res[1] for res in results])
-            pattern = r'\]\s*([a-zA-Z0-9_]+)'
-            usernames = re.findall(pattern, full_text)
-            self.ocr_complete_signal.emit(usernames, "")
+            with self.ocr_lock:
+                check_cancelled(job["cancelled"])
+                if self.ocr_reader is None:
+                    with trace.stage("model_reload"):
+                        self.reload_ocr()
+                if "video" in job["payload"]:
+                    if job["payload"]["reset"]:
+                        self.append_row_signatures = set()
+                    progress = lambda frames, passes: self.ocr_status_signal.emit(
+                        f"Reading video (job #{job['id']}): {frames} frames sampled, {passes} OCR passes...")
+                    usernames, stats = extract_usernames_from_video(self.ocr_reader, job["payload"]["video"], self.settings,
+                                                                    self.ocr_cache, job["cancelled"], trace, progress)
+                    stats["append"] = job["payload"]["append"]
+                else:
+                    with trace.stage("convert"):
+                        image_data, _owner = qimage_to_numpy(job["payload"]["image"])
+                    if job["payload"]["append"]:
+                        usernames, stats = self._extract_appended(image_data, job, trace)
+                    else:
+                        usernames, stats = extract_usernames(self.ocr_reader, image_data, self.settings, self.ocr_cache,
+                                                             job["cancelled"], trace, self.tiler)
+            finished = time.perf_counter()
+            stats.update(job_id=job["id"], queue_ms=round((started - job["submitted"]) * 1000, 1),
+                         latency_ms=round((finished - job["submitted"]) * 1000, 1),
+                         stages=trace.summary(), trace=trace.to_dict())
+            return usernames, "", stats
+        except JobCancelled:
+            return [], "", {"job_id": job["id"], "cancelled": True, "append": job["payload"]["append"]}
         except Exception as e:
-            self.ocr_complete_signal.emit([], str(e))
+            return [], str(e), {"job_id": job["id"], "append": job["payload"]["append"]}
+        finally:
+            self.last_ocr_use = time.monotonic()
             
+    def _extract_appended(self, image_data, job, trace):
+        if job["payload"]["reset"]:
+            self.append_row_signatures = set()
+        with trace.stage("overlap"):
+            image_data = crop_to_list(image_data, self.settings)
+            image_data, overlap_rows, signatures = crop_to_new_rows(image_data, self.append_row_signatures)
+        if image_data is None:
+            return [], {"append": True, "overlap_rows": overlap_rows}
+        usernames, stats = extract_usernames(self.ocr_reader, image_data, self.settings, self.ocr_cache,
+                                             job["cancelled"], trace, self.tiler)
+        self.append_row_signatures.update(signatures)
+        stats.update(append=True, overlap_rows=overlap_rows)
+        return usernames, stats
+
     def show_help_menu(self):
         menu = QMenu(self)
         how_to_action = QAction("How to Use...", self)
         how_to_action.triggered.connect(lambda: HelpDialog(self).exec())
         menu.addAction(how_to_action)
+        timings_action = QAction("Show Stage Timings", self)
+        timings_action.setCheckable(True)
+        timings_action.setChecked(self.settings["show_stage_timings"])
+        timings_action.toggled.connect(lambda checked: self.settings.update(show_stage_timings=checked))
+        menu.addAction(timings_action)
+        export_action = QAction("Export Timings...", self)
+        export_action.setEnabled(bool(self.trace_log))
+        export_action.triggered.connect(self.export_timings)
+        menu.addAction(export_action)
+        history_action = QAction("Attendance History...", self)
+        history_action.setEnabled(self.history is not None)
+        history_action.triggered.connect(lambda: HistoryDialog(self.history, self).exec())
+        menu.addAction(history_action)
         about_action = QAction("About...", self)
         about_action.triggered.connect(lambda: QMessageBox.about(self, "About Themis", "Released under Themis; for use in 2C.\nMade by OyundaEmirYT"))
         menu.addAction(about_action)
         menu.exec(self.help_button.mapToGlobal(self.help_button.rect().bottomLeft()))
 
+    def export_timings(self):
+        path, selected_filter = QFileDialog.getSaveFileName(self, "Export Timings", "themis_timings.json",
+                                                            "Chrome trace (*.json);;Timing log (*.json)")
+        if not path:
+            return
+        traces = list(self.trace_log)
+        data = traces_to_chrome(traces) if selected_filter.startswith("Chrome") else traces
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
+        self.status_label.setText(f"Exported timings for {len(traces)} runs to {os.path.basename(path)}.")
+
     def generate_log_entry(self):
-        error_messages = []
         host = self.host_input.text().strip()
-
-
-        if not host:
-            error_messages.append("- Host name is missing.")
-        elif not is_valid_roblox_username(host):
-            error_messages.append(f"- Host username '{host}' is invalid.")
-
         all_names_from_box = [line.strip() for line in self.attendee_box.toPlainText().split('\n') if line.strip()]
         
         if self.master_usernames:
             suggestions = []
-            SIMILARITY_THRESHOLD = 0.8 
-            for name in all_names_from_box:
-                if name not in self.master_usernames:
-                    potential_matches = difflib.get_close_matches(name, self.master_usernames, n=1, cutoff=SIMILARITY_THRESHOLD)
-                    if potential_matches:
-                        best_match = potential_matches[0]
-                        score = difflib.SequenceMatcher(None, name, best_match).ratio()
-                        suggestions.append((name, best_match, score))
+            trace = PipelineTrace("suggestions")
+            with trace.stage("suggest"):
+                for name in all_names_from_box:
+                    if name not in self.master_usernames:
+                        potential_matches = self.master_usernames.get_close_matches(name, n=1, cutoff=SIMILARITY_THRESHOLD)
+                        if potential_matches:
+                            best_match, score = potential_matches[0]
+                            suggestions.append((name, best_match, score))
+            self.trace_log.append(trace.to_dict())
             if suggestions:
                 dialog = SuggestionDialog(suggestions, self)
                 if dialog.exec(): 
@@ -364,20 +2567,8 @@ class MainWindow(QMainWindow):
                     self.status_label.setText("Log generation cancelled.")
                     return
 
-        invalid_attendees = [name for name in all_names_from_box if not is_valid_roblox_username(name)]
-        if invalid_attendees:
-            error_list = "\n  - ".join(invalid_attendees)
-            error_messages.append(f"- The following attendee usernames are invalid:\n  - {error_list}")
-
-        final_attendees = [name for name in all_names_from_box if name.lower() != host.lower()]
         event_type = self.event_input.currentText()
-        num_attendees = len(final_attendees)
-        min_required = 1 if event_type == "Crate Run" else 2
-        
-        if num_attendees < min_required:
-            plural_s = "" if min_required == 1 else "s"
-            error_messages.append(f"- A '{event_type}' requires at least {min_required} attendee{plural_s} (excluding host). You only have {num_attendees}.")
-
+        error_messages = validate_log_fields(event_type, host, all_names_from_box)
         if error_messages:
             full_error_message = "Please fix the following issues before generating the log:\n\n" + "\n\n".join(error_messages)
             QMessageBox.warning(self, "Validation Errors", full_error_message)
@@ -390,15 +2581,17 @@ class MainWindow(QMainWindow):
              if reply == QMessageBox.StandardButton.No:
                  return
 
-        attendees_string = "\n".join(final_attendees) if final_attendees else "N/A"
-        log_entry = (f"Event: {self.event_input.currentText()}\n"
-                     f"Squad: {self.squad_input.currentText()}\n"
-                     f"Host: {host}\n"
-                     f"Day: {self.day_input.currentText().lower()}\n"
-                     f"Description: {self.desc_input.toPlainText().strip() or 'N/A'}\n"
-                     f"Attendees:\n{attendees_string}")
-        self.output_area.setPlainText(log_entry.strip())
+        log_entry = format_log_entry(event_type, self.squad_input.currentText(), host, self.day_input.currentText(),
+                                     self.desc_input.toPlainText(), all_names_from_box)
+        self.output_area.setPlainText(log_entry)
         self.status_label.setText("Log generated successfully!")
+        if self.history:
+            try:
+                self.recorded_event_id = self.history.record(event_type, self.squad_input.currentText(), host, self.day_input.currentText(),
+                                                             self.desc_input.toPlainText(), all_names_from_box,
+                                                             replace_id=self.recorded_event_id)
+            except sqlite3.Error as e:
+                self.status_label.setText(f"Log generated, but it could not be saved to the attendance history ({e}).")
 
     def copy_log_to_clipboard(self):
         log_text = self.output_area.toPlainText()
@@ -529,8 +2722,105 @@ class MainWindow(QMainWindow):
         """
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow() 
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Themis; SELA - Event Log Aid")
+    parser.add_argument("--startup-report", nargs="?", const="-", metavar="PATH",
+                        help="Print startup timings as JSON (or write them to PATH) once OCR is ready, then exit.")
+    parser.add_argument("--bench-matcher", action="store_true",
+                        help="Compare the indexed username matcher against difflib and print the timings as JSON.")
+    parser.add_argument("--roster", metavar="PATH", help="Username list to benchmark with (default: usernames.txt).")
+    parser.add_argument("--roster-size", type=int, default=0, metavar="N",
+                        help="Pad the benchmark roster with random names up to N entries.")
+    parser.add_argument("--queries", type=int, default=500, metavar="N", help="Number of misspelt names to look up.")
+    parser.add_argument("--batch", metavar="SOURCE",
+                        help="Process a folder of screenshots (one event per image) or a JSON manifest without opening the window.")
+    parser.add_argument("--event", choices=EVENT_TYPES, default=EVENT_TYPES[0], help="Event type for batch entries.")
+    parser.add_argument("--squad", choices=SQUADS, default=SQUADS[0], help="Squad for batch entries.")
+    parser.add_argument("--host", default="", help="Host username for batch entries.")
+    parser.add_argument("--day", choices=DAYS, help="Day for batch entries (default: the day each screenshot was taken).")
+    parser.add_argument("--description", default="", help="Description for batch entries.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="Number of OCR worker processes for batch mode.")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format for batch mode and history reports.")
+    parser.add_argument("--output", default="-", metavar="PATH", help="Write batch or report output to PATH instead of stdout.")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Run extraction and suggestion matching over synthetic screenshots and print a JSON report.")
+    parser.add_argument("--bench-images", type=int, default=24, metavar="N", help="Number of synthetic screenshots to benchmark.")
+    parser.add_argument("--bench-save", metavar="DIR", help="Also save the synthetic screenshots to DIR.")
+    parser.add_argument("--verify-backend", choices=OCR_BACKENDS, metavar="BACKEND",
+                        help="Check that an OCR backend reads the benchmark screenshots the same as the default one, and compare speed.")
+    parser.add_argument("--import-logs", nargs="+", metavar="FILE",
+                        help="Add previously posted logs from text files to the attendance history.")
+    parser.add_argument("--log-date", type=datetime.date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Date the imported logs were posted (default: each file's modification date).")
+    parser.add_argument("--history", choices=["members", "squads"],
+                        help="Print attendance counts per member or per squad from the attendance history.")
+    parser.add_argument("--member", metavar="NAME", help="With --history, print one member's attendance by event type.")
+    parser.add_argument("--since", type=datetime.date.fromisoformat, metavar="YYYY-MM-DD", help="Start of the history report (default: this Monday).")
+    parser.add_argument("--until", type=datetime.date.fromisoformat, metavar="YYYY-MM-DD", help="End of the history report (default: today).")
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8765", metavar="HOST:PORT",
+                        help="Run a local extraction server that other copies of the application can use (default: 127.0.0.1:8765).")
+    args, qt_args = parser.parse_known_args()
+    if args.serve:
+        run_server(args.serve, load_settings())
+        sys.exit(0)
+    if args.import_logs or args.history:
+        store = AttendanceStore.from_settings(load_settings())
+        for path in args.import_logs or []:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                counts = store.import_logs(f.read(), args.log_date or datetime.date.fromtimestamp(os.path.getmtime(path)))
+            print(f"{path}: imported {counts['imported']}, already recorded {counts['duplicates']}, incomplete {counts['skipped']}")
+        if args.history:
+            week_start, today = current_week()
+            start, end = args.since or week_start, args.until or today
+            view = "member" if args.member else args.history
+            if args.format == "json":
+                if view == "member":
+                    report = store.member_summary(args.member, start, end)
+                elif view == "squads":
+                    report = [{"squad": squad, "events": events, "attendances": attendance or 0}
+                              for squad, events, attendance in store.squad_totals(start, end)]
+                else:
+                    report = [{"username": username, "events": count} for username, count in store.member_counts(start, end)]
+                text = json.dumps({"since": start.isoformat(), "until": end.isoformat(), "report": report}, indent=2)
+            else:
+                text = format_history_report(store, view, start, end, args.member)
+            write_output(text, args.output, "history_report.txt")
+        sys.exit(0)
+    if args.verify_backend:
+        roster = load_roster(args.roster or default_roster_path())
+        report = verify_backend(args.verify_backend, build_benchmark_corpus(list(roster), args.bench_images), load_settings(), roster)
+        write_output(json.dumps(report, indent=2), args.output, "backend_report.json")
+        sys.exit(0)
+    if args.benchmark:
+        roster = load_roster(args.roster or default_roster_path())
+        corpus = build_benchmark_corpus(list(roster), args.bench_images)
+        if args.bench_save:
+            os.makedirs(args.bench_save, exist_ok=True)
+            for index, sample in enumerate(corpus):
+                Image.fromarray(sample["image"]).save(os.path.join(args.bench_save, f"synthetic_{index:03d}.png"))
+        settings = load_settings()
+        start = time.perf_counter()
+        reader = create_ocr_reader(settings, roster)
+        load_s = time.perf_counter() - start
+        report = summarize_benchmark(run_benchmark(reader, corpus, roster, settings))
+        report["model_load_s"] = round(load_s, 2)
+        write_output(json.dumps(report, indent=2), args.output, "benchmark_report.json")
+        sys.exit(0)
+    if args.batch:
+        defaults = {"event": args.event, "squad": args.squad, "host": args.host, "day": args.day, "description": args.description}
+        jobs = load_batch_jobs(args.batch, defaults)
+        roster_path = default_roster_path()
+        roster = load_roster(roster_path) if os.path.exists(roster_path) else UsernameMatcher([])
+        results = run_batch(jobs, roster, args.workers, load_settings()) if jobs else []
+        write_output(format_batch_results(results, args.format), args.output, "batch_output.txt")
+        sys.exit(0)
+    if args.bench_matcher:
+        roster_path = args.roster or default_roster_path()
+        print(json.dumps(benchmark_matcher(roster_path, args.roster_size, args.queries), indent=2))
+        sys.exit(0)
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = MainWindow(startup_report_path=args.startup_report)
     stylesheet = window.get_stylesheet()
     app.setStyleSheet(stylesheet)  
     window.show()